@@ -1,37 +1,31 @@
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-import glob
-import os
 
-folder = "./data/round1/"
-
-# === 1. Load and merge pricing data with timestamp shifting ===
-price_files = sorted(glob.glob(os.path.join(folder, "prices_round_1_day_*.csv")))
-price_df_list = []
+import tick_stream
+from backtester import day_files
 
-time_offset = 0
-for file in price_files:
-    df = pd.read_csv(file, sep=';')
-    df['timestamp'] = pd.to_numeric(df['timestamp'], errors='coerce')
-    df['timestamp'] += time_offset
-    time_offset = df['timestamp'].max() + 1  # Shift next day after this one's max timestamp
-    price_df_list.append(df)
+folder = "./data/round1/"
 
-price_df = pd.concat(price_df_list, ignore_index=True)
+# === 1-2. Stream every day's prices and trades with timestamp shifting, keeping only the plotted columns ===
+price_columns = {"timestamp": [], "product": [], "mid_price": []}
+trade_columns = {"timestamp": [], "symbol": [], "price": [], "quantity": []}
 
-# === 2. Load and merge trade data with timestamp shifting ===
-trade_files = sorted(glob.glob(os.path.join(folder, "trades_round_1_day_*.csv")))
-trade_df_list = []
+for batch in tick_stream.iter_batches(day_files(folder, 1), ticks=1000):
+    strings = np.array(batch.strings, dtype=object)
+    price_columns["timestamp"].append(batch.prices["timestamp"])
+    price_columns["product"].append(strings[batch.prices["product"]])
+    price_columns["mid_price"].append(batch.prices["mid_price"])
 
-time_offset = 0
-for file in trade_files:
-    df = pd.read_csv(file, sep=';')
-    df['timestamp'] = pd.to_numeric(df['timestamp'], errors='coerce')
-    df['timestamp'] += time_offset
-    time_offset = df['timestamp'].max() + 1
-    trade_df_list.append(df)
+    if batch.trades:
+        trade_strings = np.array(batch.trade_strings, dtype=object)
+        trade_columns["timestamp"].append(batch.trades["timestamp"])
+        trade_columns["symbol"].append(trade_strings[batch.trades["symbol"]])
+        trade_columns["price"].append(batch.trades["price"])
+        trade_columns["quantity"].append(batch.trades["quantity"])
 
-trade_df = pd.concat(trade_df_list, ignore_index=True)
+price_df = pd.DataFrame({name: np.concatenate(parts) for name, parts in price_columns.items()})
+trade_df = pd.DataFrame({name: np.concatenate(parts) for name, parts in trade_columns.items()})
 
 # === 3. Plotting Mid Prices (excluding Resin) ===
 plt.figure(figsize=(10, 5))
@@ -0,0 +1,379 @@
+import argparse
+import contextlib
+import csv
+import glob
+import importlib.util
+import io
+import os
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import tick_cache
+import tick_stream
+from datamodel import Listing, Observation, Order, OrderDepth, Symbol, Trade, TradingState
+from order_coalescing import DEFAULT_POSITION_LIMIT, POSITION_LIMITS
+from passive_fills import PassiveFills
+
+# One book snapshot: (buy_orders, sell_orders, mid_price), volumes signed like OrderDepth
+Book = Tuple[Dict[int, int], Dict[int, int], float]
+
+
+def load_prices(path: str) -> Dict[int, Dict[Symbol, Book]]:
+    """Read a prices_round_*_day_*.csv into {timestamp: {product: book}}, in file order."""
+    books: Dict[int, Dict[Symbol, Book]] = {}
+    with open(path, newline="") as f:
+        reader = csv.reader(f, delimiter=";")
+        next(reader)
+        for row in reader:
+            buy_orders = {}
+            sell_orders = {}
+            for i in (3, 5, 7):
+                if row[i]:
+                    buy_orders[int(float(row[i]))] = int(row[i + 1])
+            for i in (9, 11, 13):
+                if row[i]:
+                    sell_orders[int(float(row[i]))] = -int(row[i + 1])
+            books.setdefault(int(row[1]), {})[row[2]] = (buy_orders, sell_orders, float(row[15]))
+
+    return books
+
+
+def load_trades(path: str) -> Dict[int, Dict[Symbol, List[Trade]]]:
+    """Read a trades_round_*_day_*.csv into {timestamp: {symbol: [Trade, ...]}}."""
+    trades: Dict[int, Dict[Symbol, List[Trade]]] = {}
+    if not os.path.exists(path):
+        return trades
+
+    with open(path, newline="") as f:
+        reader = csv.reader(f, delimiter=";")
+        next(reader)
+        for row in reader:
+            timestamp = int(row[0])
+            trade = Trade(row[3], int(float(row[5])), int(row[6]), row[1], row[2], timestamp)
+            trades.setdefault(timestamp, {}).setdefault(trade.symbol, []).append(trade)
+
+    return trades
+
+
+def load_trader(path: str, **params: Any) -> Any:
+    """Import a strategy file (hyphenated names like tutorial-algo.py included) and return a fresh Trader.
+
+    Keyword arguments are forwarded to the Trader constructor, so tuning knobs can be overridden.
+    """
+    name = os.path.splitext(os.path.basename(path))[0].replace("-", "_")
+    directory = os.path.dirname(os.path.abspath(path))
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.Trader(**params)
+
+
+def day_files(folder: str, round_num: int) -> List[Tuple[int, str, str]]:
+    """List (day, prices_path, trades_path) for every prices file of a round, ordered by day."""
+    days = []
+    for prices_path in glob.glob(os.path.join(folder, f"prices_round_{round_num}_day_*.csv")):
+        day = int(prices_path.rsplit("_day_", 1)[1][:-4])
+        trades_path = os.path.join(folder, f"trades_round_{round_num}_day_{day}.csv")
+        days.append((day, prices_path, trades_path))
+
+    return sorted(days)
+
+
+class BacktestResult:
+    def __init__(self) -> None:
+        self.timestamps: List[int] = []
+        self.pnl: List[float] = []
+        self.product_pnl: Dict[Symbol, float] = {}
+        self.position: Dict[Symbol, int] = {}
+        self.own_trades: List[Trade] = []
+        self.sandbox_logs: List[str] = []
+        self.lambda_logs: List[str] = []
+        self.elapsed = 0.0
+
+    @property
+    def final_pnl(self) -> float:
+        return self.pnl[-1] if self.pnl else 0.0
+
+    @property
+    def max_drawdown(self) -> float:
+        peak = float("-inf")
+        drawdown = 0.0
+        for value in self.pnl:
+            peak = max(peak, value)
+            drawdown = max(drawdown, peak - value)
+
+        return drawdown
+
+    @property
+    def fills(self) -> int:
+        return len(self.own_trades)
+
+
+class Backtester:
+    """Replays one day of book snapshots and market trades through Trader.run.
+
+    Orders are checked against the position limits the exchange uses (all orders for a
+    product are rejected if they could breach the limit), then filled against the visible
+    book and, if match_trades is set, against market trades printed at the same timestamp.
+
+    With `passive` (a passive_fills.PassiveFills) the part of an order that doesn't cross rests in
+    a price-level queue behind the visible volume and only fills once prints work through it,
+    instead of filling against any market trade at its price.
+
+    Instead of books/trades dicts, `stream` may be an iterable of tick_stream.Snapshot, e.g. several
+    days from tick_stream.iter_snapshots; it is consumed lazily and products are listed as they appear.
+    """
+
+    def __init__(self,
+                 trader: Any,
+                 books: Optional[Dict[int, Dict[Symbol, Book]]] = None,
+                 trades: Optional[Dict[int, Dict[Symbol, List[Trade]]]] = None,
+                 position_limits: Dict[Symbol, int] = None,
+                 match_trades: bool = True,
+                 capture_output: bool = True,
+                 stream: Optional[Iterable[tick_stream.Snapshot]] = None,
+                 passive: Optional[PassiveFills] = None) -> None:
+        self.trader = trader
+        self.books = {} if books is None else books
+        self.trades = {} if trades is None else trades
+        self.stream = stream
+        self.passive = passive
+        self.position_limits = POSITION_LIMITS if position_limits is None else position_limits
+        self.match_trades = match_trades
+        self.capture_output = capture_output
+
+    def ticks(self) -> Iterator[Tuple[int, Dict[Symbol, Book], Dict[Symbol, List[Trade]]]]:
+        """(timestamp, books, market trades) per tick, from the stream if there is one."""
+        if self.stream is not None:
+            for snapshot in self.stream:
+                yield snapshot.timestamp, snapshot.books, snapshot.trades
+        else:
+            for timestamp, snapshot in self.books.items():
+                yield timestamp, snapshot, self.trades.get(timestamp, {})
+
+    def run(self) -> BacktestResult:
+        result = BacktestResult()
+        products = sorted({product for snapshot in self.books.values() for product in snapshot})
+        listings = {product: Listing(product, product, "SEASHELLS") for product in products}
+        position: Dict[Symbol, int] = {product: 0 for product in products}
+        cash: Dict[Symbol, float] = {product: 0.0 for product in products}
+        mid_prices: Dict[Symbol, float] = {}
+
+        trader_data = ""
+        own_trades: Dict[Symbol, List[Trade]] = {}
+        market_trades: Dict[Symbol, List[Trade]] = {}
+        start = time.perf_counter()
+
+        for timestamp, snapshot, snapshot_trades in self.ticks():
+            order_depths = {}
+            for product, (buy_orders, sell_orders, mid_price) in snapshot.items():
+                if product not in listings:
+                    listings[product] = Listing(product, product, "SEASHELLS")
+                    position[product] = 0
+                    cash[product] = 0.0
+                order_depth = OrderDepth()
+                order_depth.buy_orders = dict(buy_orders)
+                order_depth.sell_orders = dict(sell_orders)
+                order_depths[product] = order_depth
+                mid_prices[product] = mid_price
+
+            state = TradingState(
+                trader_data,
+                timestamp,
+                listings,
+                order_depths,
+                own_trades,
+                market_trades,
+                {product: quantity for product, quantity in position.items() if quantity != 0},
+                Observation({}, {}),
+            )
+
+            if self.capture_output:
+                stdout = io.StringIO()
+                with contextlib.redirect_stdout(stdout):
+                    orders, conversions, trader_data = self.trader.run(state)
+                result.lambda_logs.append(stdout.getvalue())
+            else:
+                orders, conversions, trader_data = self.trader.run(state)
+
+            # Market trades are handed out by value so a strategy can't see our consumption of them
+            tick_trades = {
+                symbol: [Trade(t.symbol, t.price, t.quantity, t.buyer, t.seller, t.timestamp) for t in arr]
+                for symbol, arr in snapshot_trades.items()
+            }
+
+            own_trades, sandbox_log = self.execute(orders, order_depths, tick_trades, position, cash, timestamp)
+            for fills in own_trades.values():
+                result.own_trades.extend(fills)
+            result.sandbox_logs.append(sandbox_log)
+            market_trades = {symbol: [t for t in arr if t.quantity > 0] for symbol, arr in tick_trades.items()}
+
+            result.timestamps.append(timestamp)
+            result.pnl.append(sum(cash[p] + position[p] * mid_prices.get(p, 0.0) for p in cash))
+
+        result.elapsed = time.perf_counter() - start
+        result.position = dict(position)
+        result.product_pnl = {p: cash[p] + position[p] * mid_prices.get(p, 0.0) for p in cash}
+        return result
+
+    def execute(self, orders: Dict[Symbol, List[Order]], order_depths: Dict[Symbol, OrderDepth],
+                trades: Dict[Symbol, List[Trade]], position: Dict[Symbol, int], cash: Dict[Symbol, float],
+                timestamp: int) -> Tuple[Dict[Symbol, List[Trade]], str]:
+        """Apply one tick of Trader output: limit checks, matching (which consumes `order_depths` and
+        `trades`), and position/cash updates. Returns the fills per product and the sandbox log."""
+        own_trades = {}
+        sandbox_log = ""
+        matched = []
+        for product, product_orders in orders.items():
+            if not product_orders or product not in order_depths:
+                continue
+
+            limit = self.position_limits.get(product, DEFAULT_POSITION_LIMIT)
+            current = position.get(product, 0)
+            total_buy = sum(order.quantity for order in product_orders if order.quantity > 0)
+            total_sell = sum(-order.quantity for order in product_orders if order.quantity < 0)
+            if current + total_buy > limit or current - total_sell < -limit:
+                sandbox_log += f"\nOrders for product {product} exceeded limit of {limit} set"
+                continue
+
+            matched.append(product)
+            fills = self.match_orders(product_orders, order_depths[product], trades.get(product, []), timestamp)
+            for trade in fills:
+                signed = trade.quantity if trade.buyer == "SUBMISSION" else -trade.quantity
+                position[product] = position.get(product, 0) + signed
+                cash[product] = cash.get(product, 0.0) - signed * trade.price
+
+            if fills:
+                own_trades[product] = fills
+
+        if self.passive is not None:
+            self.passive.cancel_missing(matched)
+        return own_trades, sandbox_log
+
+    def match_orders(self, orders: List[Order], order_depth: OrderDepth, trades: List[Trade], timestamp: int) -> List[Trade]:
+        fills = []
+        resting = []
+        match_trades = self.match_trades and self.passive is None
+        for order in orders:
+            if order.quantity > 0:
+                remaining = order.quantity
+                for price in sorted(order_depth.sell_orders):
+                    if price > order.price or remaining == 0:
+                        break
+                    volume = min(remaining, -order_depth.sell_orders[price])
+                    fills.append(Trade(order.symbol, price, volume, "SUBMISSION", "", timestamp))
+                    remaining -= volume
+                    order_depth.sell_orders[price] += volume
+                    if order_depth.sell_orders[price] == 0:
+                        del order_depth.sell_orders[price]
+
+                if remaining:
+                    resting.append((order.price, remaining))
+                if match_trades:
+                    for trade in trades:
+                        if remaining == 0:
+                            break
+                        if trade.quantity > 0 and trade.price <= order.price:
+                            volume = min(remaining, trade.quantity)
+                            fills.append(Trade(order.symbol, order.price, volume, "SUBMISSION", trade.seller, timestamp))
+                            remaining -= volume
+                            trade.quantity -= volume
+
+            elif order.quantity < 0:
+                remaining = -order.quantity
+                for price in sorted(order_depth.buy_orders, reverse=True):
+                    if price < order.price or remaining == 0:
+                        break
+                    volume = min(remaining, order_depth.buy_orders[price])
+                    fills.append(Trade(order.symbol, price, volume, "", "SUBMISSION", timestamp))
+                    remaining -= volume
+                    order_depth.buy_orders[price] -= volume
+                    if order_depth.buy_orders[price] == 0:
+                        del order_depth.buy_orders[price]
+
+                if remaining:
+                    resting.append((order.price, -remaining))
+                if match_trades:
+                    for trade in trades:
+                        if remaining == 0:
+                            break
+                        if trade.quantity > 0 and trade.price >= order.price:
+                            volume = min(remaining, trade.quantity)
+                            fills.append(Trade(order.symbol, order.price, volume, trade.buyer, "SUBMISSION", timestamp))
+                            remaining -= volume
+                            trade.quantity -= volume
+
+        if self.passive is not None:
+            product = orders[0].symbol
+            self.passive.rest(product, resting, order_depth)
+            if self.match_trades:
+                fills.extend(self.passive.match(product, trades, timestamp))
+        return fills
+
+
+def run_day(trader_path: str, prices_path: str, trades_path: str, **kwargs: Any) -> BacktestResult:
+    books = tick_cache.load_books(prices_path)
+    trades = tick_cache.load_market_trades(trades_path)
+    return Backtester(load_trader(trader_path), books, trades, **kwargs).run()
+
+
+def run_days(trader_path: str, days: List[Tuple[int, str, str]], capture_output: bool = False,
+             **kwargs: Any) -> BacktestResult:
+    """One continuous run over several days: positions and traderData carry across day boundaries.
+
+    Days are streamed, so only the current day's ticks are decoded at a time; timestamps are shifted
+    so each day follows the previous one (see tick_stream.iter_snapshots). Trader output is discarded
+    unless capture_output is set, as keeping every tick's logs grows with the days replayed; the
+    result still grows by each tick's PnL, timestamp and fills.
+    """
+    backtester = Backtester(load_trader(trader_path), stream=tick_stream.iter_snapshots(days),
+                            capture_output=capture_output, **kwargs)
+    if capture_output:
+        return backtester.run()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return backtester.run()
+
+
+def print_result(label: str, result: BacktestResult) -> None:
+    print(f"{label}: PnL {result.final_pnl:,.1f}  max drawdown {result.max_drawdown:,.1f}  "
+          f"fills {result.fills}  ticks {len(result.timestamps)}  {result.elapsed:.2f}s")
+    for product, pnl in result.product_pnl.items():
+        print(f"  {product}: {pnl:,.1f} (position {result.position.get(product, 0)})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded round data through a Trader locally.")
+    parser.add_argument("trader", help="strategy file, e.g. smart_moving_algo_r1.py")
+    parser.add_argument("--data", default="./data/round1/", help="folder holding prices/trades CSVs")
+    parser.add_argument("--round", type=int, default=1)
+    parser.add_argument("--days", type=int, nargs="*", help="days to replay (default: all)")
+    parser.add_argument("--no-trade-matching", action="store_true", help="only fill against the visible book")
+    parser.add_argument("--queue-fills", action="store_true",
+                        help="fill resting remainders only once prints work through the visible queue ahead")
+    parser.add_argument("--keep-queue", action="store_true",
+                        help="with --queue-fills, orders re-sent at the same price keep their queue position")
+    parser.add_argument("--continuous", action="store_true",
+                        help="replay the selected days as one run, carrying positions across days")
+    args = parser.parse_args()
+
+    days = [files for files in day_files(args.data, args.round) if not args.days or files[0] in args.days]
+    options = {"match_trades": not args.no_trade_matching}
+    if args.continuous:
+        if days:
+            if args.queue_fills:
+                options["passive"] = PassiveFills(args.keep_queue)
+            print_result(f"Days {days[0][0]} to {days[-1][0]}", run_days(args.trader, days, **options))
+        return
+
+    for day, prices_path, trades_path in days:
+        if args.queue_fills:
+            options["passive"] = PassiveFills(args.keep_queue)
+        print_result(f"Day {day}", run_day(args.trader, prices_path, trades_path, **options))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+import order_coalescing
+from datamodel import Order, OrderDepth, Symbol
+from rolling_stats import RollingStats
+
+BASKETS = ("PICNIC_BASKET1", "PICNIC_BASKET2")
+CONSTITUENTS = ("CROISSANTS", "JAMS", "DJEMBES")
+# Units of each constituent in one basket: rows follow BASKETS, columns follow CONSTITUENTS
+WEIGHTS = ((6, 3, 1), (4, 2, 0))
+POSITION_LIMITS: Dict[Symbol, int] = {
+    product: order_coalescing.POSITION_LIMITS[product] for product in BASKETS + CONSTITUENTS
+}
+
+# Ticks of basket-minus-synthetic spread kept for the rolling mean / z-score
+SPREAD_WINDOW = 100
+SPREAD_SUFFIX = "_SPREAD"
+# Without an arbitrage, lean against the spread once its z-score passes ENTRY_Z, LEAN_SIZE baskets a tick
+ENTRY_Z = 2.0
+LEAN_SIZE = 5
+
+
+class BasketQuote(NamedTuple):
+    """One basket against its synthetic (the weighted constituents) at the current tick.
+
+    sell_size / buy_size are the baskets that could be sold at the basket bid while buying every
+    leg at its ask (buy_size: the reverse) for a locked-in profit, capped by top-of-book volume and
+    position limits; 0 when the books don't cross.
+    """
+    basket: Symbol
+    bid: int
+    ask: int
+    synthetic: float
+    spread: float
+    mean: float
+    zscore: float
+    samples: int
+    sell_size: int
+    buy_size: int
+
+
+class BasketEngine:
+    """Synthetic value and spread of every basket from one matrix-vector product over the books.
+
+    Each tick the top of book of all baskets and constituents is read into arrays once; synthetic
+    mids, bids and asks are `weights @ leg prices`, and arbitrage sizes are reduced over the weight
+    matrix, so nothing loops per leg. Spread windows live in `stats` (pass the Trader's
+    RollingStats to have them saved in traderData with everything else), updated in O(1) a tick.
+    """
+
+    def __init__(self, weights: Sequence[Sequence[int]] = WEIGHTS, baskets: Sequence[Symbol] = BASKETS,
+                 constituents: Sequence[Symbol] = CONSTITUENTS, window: int = SPREAD_WINDOW,
+                 position_limits: Optional[Dict[Symbol, int]] = None, stats: Optional[RollingStats] = None,
+                 entry_z: float = ENTRY_Z, lean_size: int = LEAN_SIZE) -> None:
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.baskets = tuple(baskets)
+        self.constituents = tuple(constituents)
+        self.products = self.baskets + self.constituents
+        limits = POSITION_LIMITS if position_limits is None else position_limits
+        self.position_limits = {product: limits.get(product, 0) for product in self.products}
+        self.limits = np.array([limits.get(product, 0) for product in self.products], dtype=np.float64)
+        self.window = window
+        self.entry_z = entry_z
+        self.lean_size = lean_size
+        self.keys = [basket + SPREAD_SUFFIX for basket in self.baskets]
+        self.stats = RollingStats(window) if stats is None else stats
+        self.stats.sizes.update({key: window for key in self.keys})
+
+        # Dividing leg volume by weight; legs a basket doesn't hold never limit it
+        self._inverse_weights = np.where(self.weights > 0, 1 / np.where(self.weights > 0, self.weights, 1), 0.0)
+        self._unused = self.weights == 0
+        # bid, bid volume, ask, ask volume per product, refreshed by update()
+        self.top: Optional[np.ndarray] = None
+
+    def read_top(self, order_depths: Dict[Symbol, OrderDepth]) -> Optional[np.ndarray]:
+        """4 x products array of best bid, bid volume, best ask, ask volume; None if any book is one-sided."""
+        rows = []
+        for product in self.products:
+            depth = order_depths.get(product)
+            if depth is None or not depth.buy_orders or not depth.sell_orders:
+                return None
+            bid = max(depth.buy_orders)
+            ask = min(depth.sell_orders)
+            rows.append((bid, depth.buy_orders[bid], ask, -depth.sell_orders[ask]))
+        return np.array(rows, dtype=np.float64).T
+
+    def _leg_capacity(self, volume: np.ndarray, room: np.ndarray) -> np.ndarray:
+        # Baskets' worth of legs available per basket: min over held legs of floor(units / weight)
+        units = np.minimum(volume, room) * self._inverse_weights
+        units[self._unused] = np.inf
+        return np.floor(units.min(axis=1))
+
+    def update(self, order_depths: Dict[Symbol, OrderDepth], position: Dict[Symbol, int]) -> List[BasketQuote]:
+        """Quotes for every basket this tick; empty if a basket or leg book is missing or one-sided."""
+        top = self.read_top(order_depths)
+        self.top = top
+        if top is None:
+            return []
+
+        n = len(self.baskets)
+        bid, bid_volume, ask, ask_volume = top
+        mid = (bid + ask) / 2
+        synthetic = self.weights @ mid[n:]
+        synthetic_bid = self.weights @ bid[n:]
+        synthetic_ask = self.weights @ ask[n:]
+        spread = mid[:n] - synthetic
+
+        held = np.array([position.get(product, 0) for product in self.products], dtype=np.float64)
+        long_room = np.maximum(self.limits - held, 0)
+        short_room = np.maximum(self.limits + held, 0)
+
+        # Sell baskets at their bid, buy the legs at their asks (and the mirror image)
+        sell = np.minimum(np.minimum(bid_volume[:n], short_room[:n]), self._leg_capacity(ask_volume[n:], long_room[n:]))
+        buy = np.minimum(np.minimum(ask_volume[:n], long_room[:n]), self._leg_capacity(bid_volume[n:], short_room[n:]))
+        sell = np.where(bid[:n] > synthetic_ask, sell, 0).astype(int).tolist()
+        buy = np.where(ask[:n] < synthetic_bid, buy, 0).astype(int).tolist()
+
+        quotes = []
+        for i, (basket, key, value) in enumerate(zip(self.baskets, self.keys, spread.tolist())):
+            window = self.stats.update(key, value)
+            quotes.append(BasketQuote(basket, int(bid[i]), int(ask[i]), float(synthetic[i]), value,
+                                      window.mean, window.zscore(value), len(window), sell[i], buy[i]))
+        return quotes
+
+    def arbitrage_orders(self, quotes: List[BasketQuote]) -> Dict[Symbol, List[Order]]:
+        """Orders for the single most profitable executable arbitrage, basket and legs at the touch.
+
+        Baskets share legs, so their sizes aren't additive; taking one per tick keeps every leg
+        within its limit.
+        """
+        if self.top is None:
+            return {}
+
+        n = len(self.baskets)
+        bid, _, ask, _ = self.top
+        best, best_profit = None, 0.0
+        for i, quote in enumerate(quotes):
+            # Profit per basket times size, for whichever side crosses
+            if quote.sell_size:
+                profit = (quote.bid - float(self.weights[i] @ ask[n:])) * quote.sell_size
+                if profit > best_profit:
+                    best, best_profit = (i, -quote.sell_size), profit
+            if quote.buy_size:
+                profit = (float(self.weights[i] @ bid[n:]) - quote.ask) * quote.buy_size
+                if profit > best_profit:
+                    best, best_profit = (i, quote.buy_size), profit
+
+        if best is None:
+            return {}
+
+        i, size = best
+        orders = {self.baskets[i]: [Order(self.baskets[i], quotes[i].ask if size > 0 else quotes[i].bid, size)]}
+        for j, leg in enumerate(self.constituents):
+            units = int(self.weights[i, j]) * -size
+            if units:
+                price = ask[n + j] if units > 0 else bid[n + j]
+                orders[leg] = [Order(leg, int(price), units)]
+        return orders
+
+    def orders(self, order_depths: Dict[Symbol, OrderDepth], position: Dict[Symbol, int]) -> Dict[Symbol, List[Order]]:
+        """This tick's basket orders: the best arbitrage if there is one, else a lean against stretched spreads."""
+        quotes = self.update(order_depths, position)
+        orders = self.arbitrage_orders(quotes)
+        if orders:
+            return orders
+
+        # No locked-in arbitrage: lean against a stretched spread with the basket alone
+        for quote in quotes:
+            if quote.samples < self.window:
+                continue
+            held = position.get(quote.basket, 0)
+            limit = self.position_limits[quote.basket]
+            if quote.zscore > self.entry_z and limit + held > 0:
+                orders[quote.basket] = [Order(quote.basket, quote.bid, -min(self.lean_size, limit + held))]
+            elif quote.zscore < -self.entry_z and limit - held > 0:
+                orders[quote.basket] = [Order(quote.basket, quote.ask, min(self.lean_size, limit - held))]
+        return orders
+
+
+def _benchmark() -> None:
+    import time
+
+    engine = BasketEngine()
+    rng = np.random.default_rng(0)
+    legs = np.array([4300.0, 6500.0, 13400.0]) + np.cumsum(rng.normal(0, 2, (10_000, 3)), axis=0)
+    baskets = legs @ engine.weights.T + rng.normal(0, 10, (len(legs), 2))
+    ticks = []
+    for basket_mids, leg_mids in zip(baskets, legs):
+        depths = {}
+        for product, mid in zip(engine.products, np.concatenate((basket_mids, leg_mids)).tolist()):
+            depth = OrderDepth()
+            depth.buy_orders = {round(mid) - 1: 20, round(mid) - 2: 15}
+            depth.sell_orders = {round(mid) + 1: -20, round(mid) + 2: -15}
+            depths[product] = depth
+        ticks.append(depths)
+
+    start = time.perf_counter()
+    arbitrages = 0
+    for depths in ticks:
+        arbitrages += bool(engine.arbitrage_orders(engine.update(depths, {})))
+    elapsed = time.perf_counter() - start
+    print(f"{len(engine.products)} legs: {elapsed / len(ticks) * 1e6:.1f} us per tick "
+          f"(quotes + arbitrage orders), {arbitrages} ticks with an executable arbitrage")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,94 @@
+import gc
+import glob
+import os
+import time
+import tracemalloc
+import types
+from typing import Any, Callable, Dict, List, Tuple
+
+import datamodel
+import tick_cache
+
+folder = "./data/round3/"
+# Construction time is the best of this many runs; a single run swings by 10-20% on a busy box
+repeats = 5
+
+
+def dict_version(cls: type) -> type:
+    # Same __init__/__str__/__repr__, but instances get a plain __dict__ like the original datamodel
+    namespace = {
+        name: value for name, value in vars(cls).items()
+        if name != "__slots__" and not isinstance(value, types.MemberDescriptorType)
+    }
+    return type(cls.__name__, (), namespace)
+
+
+def load_ticks(trade_tables: List[tick_cache.TickTable]) -> List[Tuple[List[str], Dict[int, Dict[str, list]]]]:
+    """Group the round-3 trade rows per day and timestamp as plain tuples, outside the timed section."""
+    days = []
+    for table in trade_tables:
+        strings = table.strings
+        rows = sorted(zip(*(table[column].tolist() for column in ("timestamp", "symbol", "price", "quantity", "buyer", "seller"))))
+        by_timestamp: Dict[int, Dict[str, list]] = {}
+        for timestamp, symbol, price, quantity, buyer, seller in rows:
+            row = (strings[symbol], price, quantity, strings[buyer], strings[seller], timestamp)
+            by_timestamp.setdefault(timestamp, {}).setdefault(row[0], []).append(row)
+        symbols = sorted({strings[code] for code in table["symbol"].tolist()})
+        days.append((symbols, by_timestamp))
+
+    return days
+
+
+def replay(classes: Dict[str, type], days: List[Tuple[List[str], Dict[int, Dict[str, list]]]]) -> List[Any]:
+    """Build every datamodel object a backtest over the round-3 trades creates, one TradingState per timestamp."""
+    Listing, Order, Trade, OrderDepth, TradingState, Observation = (
+        classes[name] for name in ("Listing", "Order", "Trade", "OrderDepth", "TradingState", "Observation")
+    )
+    states = []
+    for symbols, by_timestamp in days:
+        for timestamp, rows_by_symbol in by_timestamp.items():
+            listings = {symbol: Listing(symbol, symbol, "SEASHELLS") for symbol in symbols}
+            order_depths = {}
+            market_trades = {}
+            orders = []
+            for symbol, rows in rows_by_symbol.items():
+                market_trades[symbol] = [Trade(*row) for row in rows]
+                order_depths[symbol] = OrderDepth()
+                orders.extend(Order(symbol, row[1], row[2]) for row in rows)
+
+            states.append((TradingState("", timestamp, listings, order_depths, {}, market_trades, {}, Observation({}, {})), orders))
+
+    return states
+
+
+def measure(label: str, build: Callable[[], List[Any]]) -> None:
+    elapsed = float("inf")
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        build()
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    tracemalloc.start()
+    objects = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+
+    print(f"{label:>9}: {elapsed * 1000:8.1f} ms construction (best of {repeats}), {current / 2 ** 20:7.2f} MiB live")
+
+
+def main() -> None:
+    tables = [tick_cache.load(path) for path in sorted(glob.glob(os.path.join(folder, "trades_round_3_day_*.csv")))]
+    names = ("Listing", "Order", "Trade", "OrderDepth", "TradingState", "Observation")
+    slotted = {name: getattr(datamodel, name) for name in names}
+    plain = {name: dict_version(cls) for name, cls in slotted.items()}
+
+    print(f"Replaying {sum(len(t) for t in tables)} round-3 trades into TradingStates")
+    days = load_ticks(tables)
+    measure("__dict__", lambda: replay(plain, days))
+    measure("__slots__", lambda: replay(slotted, days))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+import log_reader
+import tick_cache
+from backtester import load_trader
+from datamodel import Listing, Observation, OrderDepth, Trade, TradingState
+
+TRADERS = ["tutorial-algo.py", "smart_moving_algo_r1.py", "moving_avg_algo.py", "round3_vouchers.py", "r3_with_viz.py"]
+DEFAULT_PRICES = "./data/round1/prices_round_1_day_0.csv"
+DEFAULT_TRADES = "./data/round1/trades_round_1_day_0.csv"
+DEFAULT_LOG = "./ceab6a93-6777-4526-92e1-eb83e912f3e2.log"
+DEFAULT_BASELINE = "bench_traders_baseline.json"
+
+# Ticks traced for allocation stats; tracemalloc slows the interpreter too much to trace every run
+ALLOCATION_TICKS = 500
+
+
+def book_states(prices_path: str, trades_path: str, ticks: int) -> List[TradingState]:
+    """TradingStates for the first `ticks` snapshots of a prices CSV, shaped like the backtester's.
+
+    Positions and own trades stay empty; market trades are the previous timestamp's prints.
+    """
+    books = tick_cache.load_books(prices_path)
+    trades = tick_cache.load_market_trades(trades_path)
+    products = sorted({product for snapshot in books.values() for product in snapshot})
+    listings = {product: Listing(product, product, "SEASHELLS") for product in products}
+
+    states = []
+    market_trades: Dict[str, List[Trade]] = {}
+    for timestamp, snapshot in list(books.items())[:ticks]:
+        order_depths = {}
+        for product, (buy_orders, sell_orders, _) in snapshot.items():
+            depth = OrderDepth()
+            depth.buy_orders = dict(buy_orders)
+            depth.sell_orders = dict(sell_orders)
+            order_depths[product] = depth
+
+        states.append(TradingState("", timestamp, listings, order_depths, {}, market_trades, {}, Observation({}, {})))
+        market_trades = trades.get(timestamp, {})
+
+    return states
+
+
+def log_states(path: str, ticks: int) -> List[TradingState]:
+    """TradingStates rehydrated from the Logger.flush payloads in a submission log's lambdaLogs."""
+    states = []
+    for section, record in log_reader.iter_log(path):
+        if section != log_reader.SANDBOX or not record.lambda_log:
+            continue
+        payload = log_reader.decode_lambda_log(record.lambda_log)
+        if payload is not None:
+            states.append(log_reader.decode_state(payload[0]))
+            if len(states) >= ticks:
+                break
+
+    return states
+
+
+def drive(trader: Any, states: List[TradingState], traced: bool = False) -> Dict[str, float]:
+    """Feed every state through trader.run, threading traderData like the exchange does."""
+    trader_data = ""
+    allocated = 0
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        for state in states:
+            state.traderData = trader_data
+            if traced:
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                _, _, trader_data = trader.run(state)
+                allocated += tracemalloc.get_traced_memory()[1] - before
+            else:
+                _, _, trader_data = trader.run(state)
+            # Don't let the shared state list keep every tick's traderData alive
+            state.traderData = ""
+        elapsed = time.perf_counter() - start
+
+    return {"elapsed": elapsed, "allocated": allocated}
+
+
+def reference_us(repeat: int = 5) -> float:
+    """Time of a fixed pure-Python workload (dicts, sorting, JSON), best of `repeat`.
+
+    Tick costs are also stored relative to it, so a baseline recorded on a quiet or fast machine
+    still compares sensibly against a run on a loaded or slow one.
+    """
+    book = {10000 + i: i % 7 + 1 for i in range(-15, 15)}
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(2000):
+            levels = sorted(book.items(), reverse=True)
+            json.loads(json.dumps({"levels": levels, "mid": sum(price for price, _ in levels) / len(levels)}))
+        best = min(best, time.perf_counter() - start)
+    return best / 2000 * 1e6
+
+
+def bench(trader_path: str, source: str, ticks: int, repeat: int = 3) -> Dict[str, Any]:
+    """Benchmark one Trader; meant to run in a fresh process so peak RSS is its own.
+
+    Throughput is the best of `repeat` runs (each with a fresh Trader), which is far less noisy
+    than the mean on a shared machine.
+    """
+    if source == "book":
+        states = book_states(DEFAULT_PRICES, DEFAULT_TRADES, ticks)
+    else:
+        states = log_states(DEFAULT_LOG, ticks)
+
+    # One untimed pass warms up imports and caches, then a fresh Trader is timed
+    drive(load_trader(trader_path), states[:100])
+    blocks = sys.getallocatedblocks()
+    elapsed = drive(load_trader(trader_path), states)["elapsed"]
+    retained = sys.getallocatedblocks() - blocks
+    for _ in range(repeat - 1):
+        elapsed = min(elapsed, drive(load_trader(trader_path), states)["elapsed"])
+
+    reference = reference_us()
+
+    traced = states[:ALLOCATION_TICKS]
+    tracemalloc.start()
+    allocation = drive(load_trader(trader_path), traced, traced=True)
+    tracemalloc.stop()
+
+    return {
+        "ticks": len(states),
+        "ticks_per_s": round(len(states) / elapsed, 1),
+        "us_per_tick": round(elapsed / len(states) * 1e6, 1),
+        "relative_cost": round(elapsed / len(states) * 1e6 / reference, 3),
+        "alloc_kib_per_tick": round(allocation["allocated"] / len(traced) / 1024, 2),
+        "retained_blocks": retained,
+        "peak_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """Regressions beyond `tolerance` (a fraction) in machine-relative tick cost, allocations or RSS."""
+    problems = []
+    for name, row in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for key in ("relative_cost", "alloc_kib_per_tick", "peak_rss_mib"):
+            if row[key] > previous[key] * (1 + tolerance):
+                problems.append(f"{name}: {key} {row[key]} vs {previous[key]} baseline")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure Trader.run throughput, allocations and memory.")
+    parser.add_argument("traders", nargs="*", default=TRADERS)
+    parser.add_argument("--source", choices=("book", "log"), default="book",
+                        help=f"states from {DEFAULT_PRICES} or rehydrated from the lambdaLogs in {DEFAULT_LOG}")
+    parser.add_argument("--ticks", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per Trader; the fastest is kept")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="record these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression before failing")
+    args = parser.parse_args()
+
+    baseline: Dict[str, Dict[str, Any]] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    print(f"{'trader':<28} {'ticks/s':>9} {'us/tick':>8} {'relative':>9} {'KiB/tick':>9} {'retained':>9} {'RSS MiB':>8}")
+    for trader_path in args.traders:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            row = pool.submit(bench, trader_path, args.source, args.ticks, args.repeat).result()
+        name = f"{args.source}:{os.path.basename(trader_path)}"
+        results[name] = row
+        print(f"{os.path.basename(trader_path):<28} {row['ticks_per_s']:>9.0f} {row['us_per_tick']:>8.1f} {row['relative_cost']:>9.3f} "
+              f"{row['alloc_kib_per_tick']:>9.2f} {row['retained_blocks']:>9} {row['peak_rss_mib']:>8.1f}")
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"baseline written to {args.baseline}")
+        return
+
+    problems = compare(results, baseline, args.tolerance)
+    for problem in problems:
+        print("REGRESSION", problem)
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import ast
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Supplied by the exchange next to the submission, so it is never bundled
+PROVIDED = {"datamodel"}
+
+_LOADER = '''
+# ---- Local modules bundled by bundle.py; edit the source files and re-bundle instead ----
+import sys as _bundle_sys
+import types as _bundle_types
+
+
+def _bundle_module(name, source):
+    module = _bundle_types.ModuleType(name)
+    module.__file__ = name + ".py"
+    _bundle_sys.modules[name] = module
+    exec(compile(source, module.__file__, "exec"), module.__dict__)
+
+'''
+
+# Imports the bundle in a directory holding only it and datamodel.py, then runs one empty tick
+_CHECK = '''
+import importlib.util, sys
+from datamodel import Observation, TradingState
+spec = importlib.util.spec_from_file_location("submission", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+module.Trader().run(TradingState("", 0, {}, {}, {}, {}, {}, Observation({}, {})))
+'''
+
+
+def local_imports(path: str) -> List[str]:
+    """Repo modules imported at the top level of `path`, in import order (function-local imports are skipped)."""
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.append(node.module)
+    return [name for name in dict.fromkeys(names)
+            if name not in PROVIDED and os.path.exists(os.path.join(HERE, f"{name}.py"))]
+
+
+def dependencies(path: str) -> List[str]:
+    """Every repo module `path` needs, transitively, ordered so each comes after the modules it imports."""
+    ordered: List[str] = []
+    visiting: Dict[str, bool] = {}
+
+    def visit(module_path: str) -> None:
+        for name in local_imports(module_path):
+            if name in ordered:
+                continue
+            if visiting.get(name):
+                raise ValueError(f"circular import involving {name}")
+            visiting[name] = True
+            visit(os.path.join(HERE, f"{name}.py"))
+            ordered.append(name)
+
+    visit(path)
+    return ordered
+
+
+def bundle(trader_path: str) -> str:
+    """One-file submission: the Trader's source after its local modules, each registered in sys.modules.
+
+    Modules keep their own namespaces and the Trader's imports are left untouched; they resolve to the
+    bundled copies because those are in sys.modules before the Trader code runs.
+    """
+    modules = dependencies(trader_path)
+    parts = [f'"""Bundled from {os.path.basename(trader_path)} with {", ".join(modules) or "no local modules"} '
+             f'(python bundle.py {os.path.basename(trader_path)})."""\n']
+    if modules:
+        parts.append(_LOADER)
+    for name in modules:
+        with open(os.path.join(HERE, f"{name}.py")) as f:
+            parts.append(f"_bundle_module({name!r}, {f.read()!r})\n")
+
+    with open(trader_path) as f:
+        parts.append(f"# ---- {os.path.basename(trader_path)} ----\n{f.read()}")
+    return "\n".join(parts)
+
+
+def check(bundle_path: str) -> None:
+    """Import the bundle with no repo modules on the path and run one tick; raises if anything is missing."""
+    with tempfile.TemporaryDirectory() as directory:
+        shutil.copy(os.path.join(HERE, "datamodel.py"), directory)
+        target = shutil.copy(bundle_path, os.path.join(directory, "submission.py"))
+        subprocess.run([sys.executable, "-c", _CHECK, target], cwd=directory, check=True,
+                       stdout=subprocess.DEVNULL, env={**os.environ, "PYTHONPATH": ""})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inline a Trader's local modules into the single file the exchange accepts.")
+    parser.add_argument("traders", nargs="+", help="strategy files, e.g. round3_vouchers.py")
+    parser.add_argument("--out", default="./dist/", help="folder for the bundled files (same names as the inputs)")
+    parser.add_argument("--no-check", action="store_true", help="skip importing each bundle in an empty directory")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for trader_path in args.traders:
+        output = os.path.join(args.out, os.path.basename(trader_path))
+        if os.path.abspath(output) == os.path.abspath(trader_path):
+            raise SystemExit(f"refusing to overwrite {trader_path}; pick another --out")
+        text = bundle(trader_path)
+        with open(output, "w") as f:
+            f.write(text)
+        if not args.no_check:
+            check(output)
+        print(f"{trader_path} -> {output}: {', '.join(dependencies(trader_path)) or 'no local modules'}, "
+              f"{len(text.encode()) / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
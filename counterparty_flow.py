@@ -0,0 +1,263 @@
+import argparse
+import glob
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import tick_cache
+
+DEFAULT_STATE = os.path.join(tick_cache.CACHE_DIR, "counterparty_flow")
+# Markout horizons in timestamp units (100 per tick)
+DEFAULT_HORIZONS = (100, 1_000, 10_000)
+ANONYMOUS = "(anonymous)"
+
+
+def _file_key(path: str) -> Tuple[int, int]:
+    # Round and day from trades_round_<r>_day_<d>.csv, used to order files and count distinct days
+    match = re.search(r"round_(\d+)_day_(-?\d+)", os.path.basename(path))
+    return (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+
+
+def _stamp(path: str) -> List[int]:
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def reference_prices(trades: tick_cache.TickTable, prices_path: Optional[str]) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """(timestamps, prices) per symbol used to mark trades: mids if a prices file exists, else the prints."""
+    if prices_path and os.path.exists(prices_path):
+        table = tick_cache.load(prices_path)
+        return {
+            product: (np.asarray(book["timestamp"]), np.asarray(book["mid_price"]))
+            for product, book in ((product, table.product(product)) for product in table.products)
+        }
+
+    return {
+        symbol: (np.asarray(prints["timestamp"]), np.asarray(prints["price"], dtype=np.float64))
+        for symbol, prints in ((symbol, trades.product(symbol)) for symbol in trades.products)
+    }
+
+
+class CounterpartyFlow:
+    """Per (counterparty, symbol) flow totals accumulated over trades files, updatable incrementally.
+
+    Counterparties and symbols are encoded once into global categorical codes; every file's trades
+    are reduced with bincount over the flat (counterparty, symbol) index, so adding a day costs one
+    pass over that day only. Each trade counts for both sides: +quantity for the buyer, -quantity
+    for the seller. Markouts are per unit traded, in the counterparty's favour: reference price
+    `horizon` later minus the trade price for buys, the reverse for sells. Trades too close to the
+    end of their day for a horizon are left out of that horizon's markout.
+    """
+
+    def __init__(self, horizons: Sequence[int] = DEFAULT_HORIZONS) -> None:
+        self.horizons = [int(horizon) for horizon in horizons]
+        self.counterparties: List[str] = []
+        self.symbols: List[str] = []
+        self.files: Dict[str, List[int]] = {}
+        self.days: List[List[int]] = []
+
+        self.bought = np.zeros((0, 0), dtype=np.int64)
+        self.sold = np.zeros((0, 0), dtype=np.int64)
+        self.buy_notional = np.zeros((0, 0))
+        self.sell_notional = np.zeros((0, 0))
+        self.trades = np.zeros((0, 0), dtype=np.int64)
+        self.markout = np.zeros((len(self.horizons), 0, 0))
+        self.markout_quantity = np.zeros((len(self.horizons), 0, 0), dtype=np.int64)
+
+    def _codes(self, names: List[str], categories: List[str]) -> np.ndarray:
+        """Global code for each of a file's strings, extending `categories` with unseen ones."""
+        index = {name: code for code, name in enumerate(categories)}
+        for name in names:
+            if name not in index:
+                index[name] = len(categories)
+                categories.append(name)
+        return np.array([index[name] for name in names], dtype=np.int64)
+
+    def _grow(self) -> None:
+        shape = (len(self.counterparties), len(self.symbols))
+        for name in ("bought", "sold", "buy_notional", "sell_notional", "trades"):
+            values = getattr(self, name)
+            setattr(self, name, np.pad(values, [(0, shape[0] - values.shape[0]), (0, shape[1] - values.shape[1])]))
+        for name in ("markout", "markout_quantity"):
+            values = getattr(self, name)
+            setattr(self, name, np.pad(values, [(0, 0), (0, shape[0] - values.shape[1]), (0, shape[1] - values.shape[2])]))
+
+    def add_file(self, trades_path: str, prices_path: Optional[str] = None) -> int:
+        """Fold one trades CSV into the totals; returns the number of trades added."""
+        table = tick_cache.load(trades_path)
+        strings = table.strings
+        # A file's string codes cover symbols and counterparties alike; map each into its own category
+        symbol_codes = np.full(len(strings), -1, dtype=np.int64)
+        party_codes = np.full(len(strings), -1, dtype=np.int64)
+
+        symbol = np.asarray(table["symbol"])
+        buyer = np.asarray(table["buyer"])
+        seller = np.asarray(table["seller"])
+        used_symbols = np.unique(symbol)
+        used_parties = np.unique(np.concatenate((buyer, seller)))
+        symbol_codes[used_symbols] = self._codes([strings[code] for code in used_symbols], self.symbols)
+        party_codes[used_parties] = self._codes([strings[code] for code in used_parties], self.counterparties)
+        self._grow()
+
+        parties, symbols = self.bought.shape
+        cells = parties * symbols
+        symbol = symbol_codes[symbol]
+        buy_cell = party_codes[buyer] * symbols + symbol
+        sell_cell = party_codes[seller] * symbols + symbol
+        quantity = np.asarray(table["quantity"], dtype=np.int64)
+        price = np.asarray(table["price"], dtype=np.float64)
+        notional = price * quantity
+
+        def add(target: np.ndarray, cell: np.ndarray, weights: np.ndarray) -> None:
+            target += np.bincount(cell, weights=weights, minlength=cells).reshape(target.shape).astype(target.dtype)
+
+        add(self.bought, buy_cell, quantity)
+        add(self.sold, sell_cell, quantity)
+        add(self.buy_notional, buy_cell, notional)
+        add(self.sell_notional, sell_cell, notional)
+        ones = np.ones(len(quantity))
+        add(self.trades, buy_cell, ones)
+        add(self.trades, sell_cell, ones)
+
+        # Reference price `horizon` after each trade, looked up per symbol with one searchsorted
+        timestamp = np.asarray(table["timestamp"], dtype=np.int64)
+        references = reference_prices(table, prices_path)
+        for h, horizon in enumerate(self.horizons):
+            later = np.full(len(timestamp), np.nan)
+            for name, (start, stop) in table.ranges.items():
+                if name not in references:
+                    continue
+                ref_timestamps, ref_prices = references[name]
+                target = timestamp[start:stop] + horizon
+                index = np.searchsorted(ref_timestamps, target, side="right") - 1
+                valid = (target <= ref_timestamps[-1]) & (index >= 0)
+                later[start:stop][valid] = ref_prices[index[valid]]
+
+            marked = ~np.isnan(later)
+            edge = np.where(marked, (later - price) * quantity, 0.0)
+            marked_quantity = np.where(marked, quantity, 0)
+            add(self.markout[h], buy_cell, edge)
+            add(self.markout[h], sell_cell, -edge)
+            add(self.markout_quantity[h], buy_cell, marked_quantity)
+            add(self.markout_quantity[h], sell_cell, marked_quantity)
+
+        self.files[os.path.abspath(trades_path)] = _stamp(trades_path)
+        day = list(_file_key(trades_path))
+        if day not in self.days:
+            self.days.append(day)
+        return len(quantity)
+
+    def update(self, folders: Sequence[str]) -> List[str]:
+        """Add every trades file in `folders` not folded in yet; returns the paths added.
+
+        A file already folded in that has since changed can't be subtracted back out, so it raises.
+        """
+        added = []
+        paths = [path for folder in folders for path in glob.glob(os.path.join(folder, "trades_round_*_day_*.csv"))]
+        for path in sorted(paths, key=_file_key):
+            stamp = self.files.get(os.path.abspath(path))
+            if stamp is not None:
+                if stamp != _stamp(path):
+                    raise ValueError(f"{path} changed since it was added; rebuild the flow state")
+                continue
+            self.add_file(path, path.replace("trades_round_", "prices_round_"))
+            added.append(path)
+        return added
+
+    def summary(self, by_symbol: bool = False) -> pd.DataFrame:
+        """Net position, VWAPs, trade counts and markouts per counterparty (and symbol)."""
+        bought, sold = self.bought, self.sold
+        buy_notional, sell_notional, trades = self.buy_notional, self.sell_notional, self.trades
+        markout, markout_quantity = self.markout, self.markout_quantity
+        if not by_symbol:
+            bought, sold, trades = bought.sum(axis=1, keepdims=True), sold.sum(axis=1, keepdims=True), trades.sum(axis=1, keepdims=True)
+            buy_notional, sell_notional = buy_notional.sum(axis=1, keepdims=True), sell_notional.sum(axis=1, keepdims=True)
+            markout, markout_quantity = markout.sum(axis=2, keepdims=True), markout_quantity.sum(axis=2, keepdims=True)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            data = {
+                "net_position": (bought - sold).ravel(),
+                "bought": bought.ravel(),
+                "sold": sold.ravel(),
+                "buy_vwap": (buy_notional / bought).ravel(),
+                "sell_vwap": (sell_notional / sold).ravel(),
+                "vwap": ((buy_notional + sell_notional) / (bought + sold)).ravel(),
+                "trades": trades.ravel(),
+                "trades_per_day": trades.ravel() / max(len(self.days), 1),
+            }
+            for h, horizon in enumerate(self.horizons):
+                data[f"markout_{horizon}"] = (markout[h] / markout_quantity[h]).ravel()
+
+        parties = [name or ANONYMOUS for name in self.counterparties]
+        if by_symbol:
+            index = pd.MultiIndex.from_product([parties, self.symbols], names=["counterparty", "symbol"])
+        else:
+            index = pd.Index(parties, name="counterparty")
+        frame = pd.DataFrame(data, index=index)
+        return frame[frame["trades"] > 0].sort_values("trades", ascending=False)
+
+    def save(self, path: str) -> None:
+        """Write the totals (<path>.npz) and categories/files seen (<path>.json)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(path + ".npz", bought=self.bought, sold=self.sold, buy_notional=self.buy_notional,
+                 sell_notional=self.sell_notional, trades=self.trades, markout=self.markout,
+                 markout_quantity=self.markout_quantity)
+        with open(path + ".json", "w") as f:
+            json.dump({
+                "horizons": self.horizons,
+                "counterparties": self.counterparties,
+                "symbols": self.symbols,
+                "files": self.files,
+                "days": self.days,
+            }, f, indent=1)
+
+    @classmethod
+    def load(cls, path: str) -> "CounterpartyFlow":
+        with open(path + ".json") as f:
+            meta = json.load(f)
+        flow = cls(meta["horizons"])
+        flow.counterparties = meta["counterparties"]
+        flow.symbols = meta["symbols"]
+        flow.files = meta["files"]
+        flow.days = meta["days"]
+        with np.load(path + ".npz") as arrays:
+            for name in ("bought", "sold", "buy_notional", "sell_notional", "trades", "markout", "markout_quantity"):
+                setattr(flow, name, arrays[name])
+        return flow
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-counterparty flow, VWAP and markouts over the trades CSVs.")
+    parser.add_argument("folders", nargs="*", default=["./data/round1/", "./data/round3/"])
+    parser.add_argument("--state", default=DEFAULT_STATE, help="saved totals to update (path without extension)")
+    parser.add_argument("--rebuild", action="store_true", help="ignore the saved totals and rescan every file")
+    parser.add_argument("--horizons", type=int, nargs="+", default=list(DEFAULT_HORIZONS))
+    parser.add_argument("--by-symbol", action="store_true")
+    args = parser.parse_args()
+
+    flow = None
+    if not args.rebuild and os.path.exists(args.state + ".json"):
+        flow = CounterpartyFlow.load(args.state)
+        if flow.horizons != args.horizons:
+            print(f"saved horizons {flow.horizons} differ, rebuilding")
+            flow = None
+    if flow is None:
+        flow = CounterpartyFlow(args.horizons)
+
+    start = time.perf_counter()
+    added = flow.update(args.folders)
+    flow.save(args.state)
+    print(f"{len(added)} new trades files folded in ({len(flow.files)} total, {len(flow.counterparties)} counterparties) "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(flow.summary(args.by_symbol).round(2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from scipy.optimize import curve_fit
+
+# Models offered by dash-view; coefficients are ordered as in these expressions (highest power first)
+MODELS: Dict[str, Callable[..., np.ndarray]] = {
+    "line": lambda x, a, b: a * x + b,
+    "sine": lambda x, a, b, c: a * np.sin(b * x + c),
+    "cosine": lambda x, a, b, c: a * np.cos(b * x + c),
+    "quadratic": lambda x, a, b, c: a * x ** 2 + b * x + c,
+    "cubic": lambda x, a, b, c, d: a * x ** 3 + b * x ** 2 + c * x + d,
+}
+
+# Models that are linear in their coefficients and have an exact least-squares solution
+POLYNOMIAL_DEGREES = {"line": 1, "quadratic": 2, "cubic": 3}
+
+# Phase offset turning the FFT's cosine phase into the model's phase
+PERIODIC_PHASE = {"sine": np.pi / 2, "cosine": 0.0}
+
+
+def _sine_jacobian(x: np.ndarray, a: float, b: float, c: float) -> np.ndarray:
+    u = b * x + c
+    cos_u = np.cos(u)
+    return np.column_stack((np.sin(u), a * x * cos_u, a * cos_u))
+
+
+def _cosine_jacobian(x: np.ndarray, a: float, b: float, c: float) -> np.ndarray:
+    u = b * x + c
+    sin_u = np.sin(u)
+    return np.column_stack((np.cos(u), -a * x * sin_u, -a * sin_u))
+
+
+# Analytic Jacobians save curve_fit the finite-difference evaluations on every iteration
+PERIODIC_JACOBIAN = {"sine": _sine_jacobian, "cosine": _cosine_jacobian}
+
+Fit = Tuple[np.ndarray, np.ndarray]
+FitResult = Union[Fit, Exception]
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="curve-fit")
+    return _executor
+
+
+def fit_polynomials(xs: List[np.ndarray], ys: List[np.ndarray], degree: int) -> List[FitResult]:
+    """Least-squares polynomial fits for many series at once.
+
+    Series sharing the same x values (the usual case: every product of a log has one row per
+    timestamp) are stacked as columns and solved with a single lstsq call. x is scaled to [-1, 1]
+    first so the Vandermonde matrix stays well-conditioned for long logs; NaNs in y are dropped.
+    """
+    results: List[Optional[FitResult]] = [None] * len(xs)
+    groups: Dict[Tuple[int, bytes], List[int]] = {}
+    for i, (x, y) in enumerate(zip(xs, ys)):
+        if not np.isfinite(y).all():
+            keep = np.isfinite(y)
+            results[i] = _fit_group(x[keep], y[keep][:, None], degree, x)[0]
+        else:
+            groups.setdefault((len(x), x[[0, -1]].tobytes() if len(x) else b""), []).append(i)
+
+    for indices in groups.values():
+        x = xs[indices[0]]
+        stacked = np.column_stack([ys[i] for i in indices]).astype(np.float64)
+        for i, result in zip(indices, _fit_group(x, stacked, degree, x)):
+            results[i] = result
+
+    return results
+
+
+def _fit_group(x: np.ndarray, y: np.ndarray, degree: int, x_eval: np.ndarray) -> List[FitResult]:
+    if len(x) <= degree:
+        return [ValueError(f"need more than {degree} points for a degree {degree} fit")] * y.shape[1]
+
+    x = x.astype(np.float64)
+    center = (x[0] + x[-1]) / 2
+    half_width = (x[-1] - x[0]) / 2 or 1.0
+    t = (x - center) / half_width
+    coefs, *_ = np.linalg.lstsq(np.vander(t, degree + 1), y, rcond=None)
+
+    # Undo the scaling: p(x) = q((x - center) / half_width), highest power first
+    scaled = np.poly1d([1 / half_width, -center / half_width])
+    results: List[FitResult] = []
+    for column in coefs.T:
+        poly = np.poly1d(column)(scaled)
+        popt = np.pad(poly.coeffs, (degree + 1 - len(poly.coeffs), 0))
+        results.append((popt, np.polyval(popt, x_eval)))
+    return results
+
+
+def periodic_guess(x: np.ndarray, y: np.ndarray, phase_offset: float) -> List[float]:
+    """Initial (amplitude, angular frequency, phase) from the strongest non-DC FFT bin."""
+    n = len(y)
+    step = (x[-1] - x[0]) / (n - 1) if n > 1 else 1.0
+    spectrum = np.fft.rfft(y - y.mean())
+    k = int(np.argmax(np.abs(spectrum[1:]))) + 1 if len(spectrum) > 1 else 0
+    amplitude = 2 * np.abs(spectrum[k]) / n if k else float(np.std(y))
+    omega = 2 * np.pi * k / (n * step)
+    # Bin k is amplitude * cos(omega * (x - x[0]) + angle); express the phase relative to x = 0
+    phase = np.angle(spectrum[k]) - omega * x[0] + phase_offset
+    return [amplitude or 1.0, omega, phase]
+
+
+def fit_model(func: Callable[..., np.ndarray], x: np.ndarray, y: np.ndarray, p0: List[float],
+              jac: Optional[Callable[..., np.ndarray]] = None) -> Fit:
+    """curve_fit on the finite points of y; returns (popt, func evaluated over all of x)."""
+    keep = np.isfinite(y)
+    popt, _ = curve_fit(func, x[keep], y[keep], p0=p0, jac=jac, maxfev=10000)
+    return popt, func(x, *popt)
+
+
+def _sse(y: np.ndarray, fit: Fit) -> float:
+    keep = np.isfinite(y)
+    return float(np.sum((fit[1][keep] - y[keep]) ** 2))
+
+
+def fit_periodic(x: np.ndarray, y: np.ndarray, function: str) -> Fit:
+    """The better of the FFT-seeded fit and the old unseeded p0=[1, 1, 1] fit (fit_generic).
+
+    The models have no offset term, so on a series far from zero the FFT seed can settle in a
+    slightly worse local minimum than the unit seed (e.g. RAINFOREST_RESIN); each fit takes a few ms.
+    """
+    keep = np.isfinite(y)
+    p0 = periodic_guess(x[keep], y[keep], PERIODIC_PHASE[function])
+    fits = []
+    for solve in (lambda: fit_model(MODELS[function], x, y, p0, PERIODIC_JACOBIAN[function]),
+                  lambda: fit_generic(x, y, function)):
+        try:
+            fits.append(solve())
+        except Exception as e:
+            error = e
+    if not fits:
+        raise error
+    return min(fits, key=lambda fit: _sse(y, fit))
+
+
+def fit_generic(x: np.ndarray, y: np.ndarray, function: str) -> Fit:
+    func = MODELS[function]
+    return fit_model(func, x, y, [1] * (func.__code__.co_argcount - 1))
+
+
+def map_fits(solve: Callable[[np.ndarray, np.ndarray], Fit], xs: List[np.ndarray], ys: List[np.ndarray]) -> List[FitResult]:
+    """Run an iterative fit per series over the thread pool, returning the exception for series that fail."""
+    def run(x: np.ndarray, y: np.ndarray) -> FitResult:
+        try:
+            return solve(x, y)
+        except Exception as e:
+            return e
+
+    if len(xs) == 1:
+        return [run(xs[0], ys[0])]
+    return list(_pool().map(run, xs, ys))
+
+
+def fit_many(function: str, xs: List[np.ndarray], ys: List[np.ndarray]) -> List[FitResult]:
+    """Fit `function` to every (x, y) series, returning (popt, fitted values) or the exception raised.
+
+    Polynomials are solved in closed form in one batch; only sine/cosine run the iterative solver,
+    seeded from the FFT and spread over a thread pool.
+    """
+    if function in POLYNOMIAL_DEGREES:
+        return fit_polynomials(xs, ys, POLYNOMIAL_DEGREES[function])
+
+    solve = fit_periodic if function in PERIODIC_PHASE else fit_generic
+    return map_fits(lambda x, y: solve(x, y, function), xs, ys)
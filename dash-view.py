@@ -1,83 +1,64 @@
 import dash
-from dash import dcc, html, Input, Output, State
-import base64
-import io
-import pandas as pd
-import json
+from dash import dcc, html, Input, Output, State, MATCH
+from dash.exceptions import PreventUpdate
 import plotly.graph_objs as go
 import numpy as np
-from scipy.optimize import curve_fit
+
+import curve_fitting
+from expressions import ExpressionError, compile_expression
+from downsample import relayout_range, window_indices
+from log_cache import LogCache
 
 app = dash.Dash(__name__)
 app.title = "Trading Log Dashboard"
 
+# Parsed logs, per-product series and fit results, shared by all callbacks
+log_cache = LogCache()
+
+# In decimated mode every trace is cut down to this many points (LTTB) for the visible x-range
+MAX_POINTS = 2000
+
 # Functions to find the best fit
-function_map = {
-    "line": lambda x, a, b: a * x + b,
-    "sine": lambda x, a, b, c: a * np.sin(b * x + c),
-    "cosine": lambda x, a, b, c: a * np.cos(b * x + c),
-    "quadratic": lambda x, a, b, c: a * x ** 2 + b * x + c,
-    "cubic": lambda x, a, b, c, d: a * x ** 3 + b * x ** 2 + c * x + d
-}
+function_map = curve_fitting.MODELS
 
 def parse_uploaded_file(contents):
-    content_type, content_string = contents.split(',')
-    decoded = base64.b64decode(content_string)
-    text = decoded.decode('utf-8')
-
-    sandbox_logs = []
-    activities_data = []
-    trade_history = []
-
-    sandbox_raw = []
-    activities_raw = []
-    trade_raw = ''
-
-    section = None
-    for line in text.splitlines():
-        if line.strip().startswith("Sandbox logs"):
-            section = "sandbox"
-            continue
-        elif line.strip().startswith("Activities log"):
-            section = "activities"
-            continue
-        elif line.strip().startswith("Trade History"):
-            section = "trades"
-            continue
-
-        if section == "sandbox":
-            sandbox_raw.append(line)
-        elif section == "activities":
-            activities_raw.append(line)
-        elif section == "trades":
-            trade_raw += line.strip()
-
-    sandbox_text = '\n'.join(sandbox_raw).strip()
-    sandbox_entries = sandbox_text.split('}\n{')
-    for i, entry in enumerate(sandbox_entries):
-        if not entry.startswith('{'):
-            entry = '{' + entry
-        if not entry.endswith('}'):
-            entry += '}'
-        try:
-            sandbox_logs.append(json.loads(entry))
-        except:
-            continue
+    # Both callbacks receive the same upload; the cache parses it once per distinct file
+    cached = log_cache.get(contents)
+    return cached.sandbox_logs, cached.activities_df, cached.trades_df
 
-    activities_text = '\n'.join(activities_raw)
-    activities_lines = activities_text.strip().split('\n')
-    try:
-        activities_df = pd.read_csv(io.StringIO('\n'.join(activities_lines)), sep=';')
-    except:
-        activities_df = pd.DataFrame()
 
-    try:
-        trade_history = json.loads(trade_raw)
-        trades_df = pd.DataFrame(trade_history)
-    except:
-        trades_df = pd.DataFrame()
+def fit_curves(selected_func, series_list):
+    # Polynomials are solved exactly in one batch; sine/cosine are fitted in parallel from FFT guesses
+    return curve_fitting.fit_many(selected_func, [s.x for s in series_list], [s.mid_price for s in series_list])
+
+
+def fit_curve(selected_func, series):
+    result = fit_curves(selected_func, [series])[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
 
-    return sandbox_logs, activities_df, trades_df
+def fit_custom(expression, series_list):
+    # Evaluated in one batch, or fitted per product when the formula uses the parameters a..d
+    return expression.fit_many([s.x for s in series_list], [s.mid_price for s in series_list])
+
+
+def fit_custom_one(expression, series):
+    result = fit_custom(expression, [series])[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def custom_expression(custom_expr):
+    if not custom_expr or not custom_expr.strip():
+        return None
+    try:
+        return compile_expression(custom_expr)
+    except ExpressionError as e:
+        print(f"Error in custom function: {e}")
+        return None
 
 
 def compute_stats(activities_df, trades_df):
@@ -117,30 +98,90 @@ def compute_stats(activities_df, trades_df):
     return stats_layout
 
 
-def generate_figures(activities_df, trades_df):
-    figures = []
+def combined_figure(cached, chart, render_mode="decimated", x_range=None):
+    """The combined mid price ("prices") or trade volume ("volumes") chart of every product."""
+    decimate = render_mode == "decimated"
+    trace = go.Scattergl if decimate else go.Scatter
+
+    if chart == "prices":
+        lines = [(f"{product} Mid Price", series.timestamp, series.mid_price) for product, series in cached.series.items()]
+        title, yaxis_title = 'Combined Asset Prices', 'Price'
+    else:
+        lines = []
+        if not cached.trades_df.empty:
+            for symbol in cached.trades_df['symbol'].unique():
+                df = cached.trades_df[cached.trades_df['symbol'] == symbol].sort_values('timestamp')
+                lines.append((f"{symbol} Quantity", df['timestamp'].to_numpy(), df['quantity'].to_numpy()))
+        title, yaxis_title = 'Combined Trade Volumes', 'Volume'
+
+    fig = go.Figure()
+    for name, x, y in lines:
+        if decimate:
+            # Like the per-product graphs, only the visible range is sampled once zoomed in
+            keep = window_indices(x, y, MAX_POINTS, x_range)
+            x, y = x[keep], y[keep]
+        fig.add_trace(trace(x=x, y=y, mode='lines', name=name))
+
+    fig.update_layout(title=title, xaxis_title='Timestamp', yaxis_title=yaxis_title, uirevision=chart)
+    if x_range is not None:
+        fig.update_layout(xaxis_range=list(x_range))
+    return fig
+
+
+def generate_figures(cached, render_mode="decimated"):
+    return [
+        dcc.Graph(id={"type": "combined-graph", "chart": chart}, figure=combined_figure(cached, chart, render_mode))
+        for chart in ("prices", "volumes")
+    ]
+
+
+def product_figure(cached, product, selected_func, custom_expr, render_mode, x_range=None):
+    series = cached.series[product]
+    x = series.x
+    fit_params_text = ""
 
-    # Create a figure for all asset prices
-    price_fig = go.Figure()
-    if not activities_df.empty:
-        for product in activities_df['product'].unique():
-            product_df = activities_df[activities_df['product'] == product].sort_values('timestamp')
-            price_fig.add_trace(go.Scatter(x=product_df['timestamp'], y=product_df['mid_price'], mode='lines', name=f'{product} Mid Price'))
+    try:
+        # Fits are cached per (product, function), so switching back and forth is free
+        popt, fit_y = cached.fit(product, selected_func, lambda s: fit_curve(selected_func, s))
+        fit_params_text = f"Fit Parameters for {selected_func}: {popt}"
+    except Exception as e:
+        fit_y = np.zeros_like(x)
+        print(f"Error in curve fitting: {e}")
+
+    traces = [("Mid Price", series.mid_price), ("SMA 10", series.sma_10), (f"Fit: {selected_func}", fit_y)]
+
+    # Evaluate (or fit) and plot the custom function if provided
+    expression = custom_expression(custom_expr)
+    if expression is not None:
+        try:
+            params, expr_y = cached.fit(product, f"custom:{expression.text}", lambda s: fit_custom_one(expression, s))
+            traces.append(("Custom Function", expr_y))
+            if expression.parameters:
+                fitted = ", ".join(f"{name}={value:.6g}" for name, value in zip(expression.parameters, params))
+                fit_params_text = f"{fit_params_text} | Custom fit: {fitted}"
+        except Exception as e:
+            print(f"Error in custom function evaluation: {e}")
 
-    price_fig.update_layout(title='Combined Asset Prices', xaxis_title='Timestamp', yaxis_title='Price')
-    figures.append(dcc.Graph(figure=price_fig))
+    if render_mode == "decimated":
+        # Pick points on the mid price and reuse them for every trace so they stay aligned;
+        # when zoomed in, only the visible range is sampled, at full resolution if it fits
+        keep = window_indices(series.timestamp, series.mid_price, MAX_POINTS, x_range)
+        trace = go.Scattergl
+    else:
+        keep = slice(None)
+        trace = go.Scatter
 
-    # Create a figure for all trade volumes
-    volume_fig = go.Figure()
-    if not trades_df.empty:
-        for symbol in trades_df['symbol'].unique():
-            df = trades_df[trades_df['symbol'] == symbol].sort_values('timestamp')
-            volume_fig.add_trace(go.Scatter(x=df['timestamp'], y=df['quantity'], mode='lines', name=f'{symbol} Quantity'))
+    fig_ind = go.Figure()
+    # Add mid price, SMA, line of best fit and custom function to the figure
+    for name, y in traces:
+        fig_ind.add_trace(trace(x=series.timestamp[keep], y=np.asarray(y)[keep], mode="lines", name=name))
 
-    volume_fig.update_layout(title='Combined Trade Volumes', xaxis_title='Timestamp', yaxis_title='Volume')
-    figures.append(dcc.Graph(figure=volume_fig))
+    # Keep the user's zoom when the figure is replaced by a re-sampled one
+    fig_ind.update_layout(uirevision=product)
+    if x_range is not None:
+        fig_ind.update_layout(xaxis_range=list(x_range))
 
-    return figures
+    return fig_ind, fit_params_text
 
 
 # The layout
@@ -166,7 +207,17 @@ app.layout = html.Div([
             value="line"
         ),
         html.Label("Custom Function (use x):"),
-        dcc.Input(id="custom-function-input", type="text", placeholder="Enter function e.g. 2*x + 1", style={"width": "100%"})
+        dcc.Input(id="custom-function-input", type="text", placeholder="Enter function e.g. 2*x + 1", style={"width": "100%"}),
+        html.Label("Rendering:"),
+        dcc.RadioItems(
+            id="render-mode",
+            options=[
+                {"label": "Decimated (WebGL, re-sampled on zoom)", "value": "decimated"},
+                {"label": "Full resolution", "value": "full"},
+            ],
+            value="decimated",
+            inline=True
+        )
     ], style={"width": "90%", "margin": "auto", "marginBottom": "20px"}),
     html.Div(id="fit-parameters", style={"marginBottom": "20px"}),
 
@@ -177,13 +228,14 @@ app.layout = html.Div([
 
 @app.callback(
     Output('output-data-upload', 'children'),
-    Input('upload-data', 'contents')
+    Input('upload-data', 'contents'),
+    Input("render-mode", "value")
 )
-def update_output(contents):
+def update_output(contents, render_mode):
     if contents is not None:
         sandbox_logs, activities_df, trades_df = parse_uploaded_file(contents)
         stats = compute_stats(activities_df, trades_df)
-        figures = generate_figures(activities_df, trades_df)
+        figures = generate_figures(log_cache.get(contents), render_mode)
         return html.Div(stats + figures)
     return html.Div("Upload a file to see the dashboard.")
 
@@ -208,73 +260,91 @@ def update_textbox_from_dropdown(selected):
     Output("fit-parameters", "children"),
     Input('upload-data', 'contents'),
     Input("function-selector", "value"),
+    Input("render-mode", "value"),
     State("custom-function-input", "value")
 )
-def update_graphs(contents, selected_func, custom_expr):
+def update_graphs(contents, selected_func, render_mode, custom_expr):
     # Check if contents are provided; if not, return empty outputs
     if not contents:
         return go.Figure(), [], ""
 
-    # Parse the uploaded file to extract dataframes
-    sandbox_logs, activities_df, trades_df = parse_uploaded_file(contents)
+    # Fetch the parsed log (parsed once per upload, then served from the cache)
+    cached = log_cache.get(contents)
 
     # If the activities dataframe is empty, return empty outputs
-    if activities_df.empty:
+    if cached.activities_df.empty:
         return go.Figure(), [], ""
 
     # Initialize a list to hold individual graphs and a string for fit parameters
     graphs = []
     fit_params_text = ""
 
-    # Iterate over each unique product in the activities dataframe
-    for product in activities_df['product'].unique():
-        # Filter and sort data for the current product
-        product_data = activities_df[activities_df['product'] == product].copy()
-        product_data = product_data.sort_values("timestamp")
-
-        # Calculate a 10-period Simple Moving Average (SMA)
-        product_data["SMA_10"] = product_data["mid_price"].rolling(window=10).mean()
-
-        # Prepare x and y data for curve fitting
-        x = np.arange(len(product_data))
-        y = product_data["mid_price"].values
+    # Fit every product in one go so the per-product figures below only read cached results
+    cached.fit_all(selected_func, lambda series_list: fit_curves(selected_func, series_list))
+    try:
+        expression = compile_expression(custom_expr) if custom_expr and custom_expr.strip() else None
+    except ExpressionError:
+        expression = None  # reported per product below
+    if expression is not None:
+        cached.fit_all(f"custom:{expression.text}", lambda series_list: fit_custom(expression, series_list))
 
-        try:
-            # Select the fitting function based on user input
-            fit_func = function_map[selected_func]
-            # Provide initial guesses for the fitting parameters
-            initial_guess = [1] * (len(fit_func.__code__.co_varnames) - 1)
-            # Curve fitting to find optimal parameters
-            popt, _ = curve_fit(fit_func, x, y, p0=initial_guess, maxfev=10000)
-            fit_y = fit_func(x, *popt)
-            fit_params_text = f"Fit Parameters for {selected_func}: {popt}"
-        except Exception as e:
-            fit_y = np.zeros_like(x)
-            print(f"Error in curve fitting: {e}")
-
-        fig_ind = go.Figure()
-        # Add mid price, SMA, and line of best fit to the figure
-        fig_ind.add_trace(go.Scatter(x=product_data["timestamp"], y=product_data["mid_price"], mode="lines", name="Mid Price"))
-        fig_ind.add_trace(go.Scatter(x=product_data["timestamp"], y=product_data["SMA_10"], mode="lines", name="SMA 10"))
-        fig_ind.add_trace(go.Scatter(x=product_data["timestamp"], y=fit_y, mode="lines", name=f"Fit: {selected_func}"))
-
-        # Evaluate and plot the custom function if provided
-        if custom_expr:
-            try:
-                # Evaluate custom expression using eval
-                expr_y = eval(custom_expr, {"x": x, "np": np})
-                fig_ind.add_trace(go.Scatter(x=product_data["timestamp"], y=expr_y, mode="lines", name="Custom Function"))
-            except Exception as e:
-                print(f"Error in custom function evaluation: {e}")
+    # Iterate over each product; its timestamp-sorted mid prices and SMA 10 are precomputed
+    for product in cached.products:
+        fig_ind, product_fit_text = product_figure(cached, product, selected_func, custom_expr, render_mode)
+        fit_params_text = product_fit_text or fit_params_text
 
         # Append the individual analysis graph to list
         graphs.append(html.Div([
             html.H4(f"{product} Analysis"),
-            dcc.Graph(figure=fig_ind)
+            dcc.Graph(id={"type": "product-graph", "product": product}, figure=fig_ind)
         ]))
 
     return go.Figure(), graphs, fit_params_text
 
 
+@app.callback(
+    Output({"type": "product-graph", "product": MATCH}, "figure"),
+    Input({"type": "product-graph", "product": MATCH}, "relayoutData"),
+    State({"type": "product-graph", "product": MATCH}, "id"),
+    State('upload-data', 'contents'),
+    State("function-selector", "value"),
+    State("custom-function-input", "value"),
+    State("render-mode", "value"),
+    prevent_initial_call=True
+)
+def resample_visible_range(relayout_data, graph_id, contents, selected_func, custom_expr, render_mode):
+    # Only zoom/pan/reset on the x-axis needs new data; everything else is handled client-side
+    if render_mode != "decimated" or not contents or not relayout_data:
+        raise PreventUpdate
+    x_range = relayout_range(relayout_data)
+    if x_range is None and not relayout_data.get("xaxis.autorange"):
+        raise PreventUpdate
+
+    cached = log_cache.get(contents)
+    if graph_id["product"] not in cached.series:
+        raise PreventUpdate
+
+    fig_ind, _ = product_figure(cached, graph_id["product"], selected_func, custom_expr, render_mode, x_range)
+    return fig_ind
+
+
+@app.callback(
+    Output({"type": "combined-graph", "chart": MATCH}, "figure"),
+    Input({"type": "combined-graph", "chart": MATCH}, "relayoutData"),
+    State({"type": "combined-graph", "chart": MATCH}, "id"),
+    State('upload-data', 'contents'),
+    State("render-mode", "value"),
+    prevent_initial_call=True
+)
+def resample_combined_range(relayout_data, graph_id, contents, render_mode):
+    if render_mode != "decimated" or not contents or not relayout_data:
+        raise PreventUpdate
+    x_range = relayout_range(relayout_data)
+    if x_range is None and not relayout_data.get("xaxis.autorange"):
+        raise PreventUpdate
+
+    return combined_figure(log_cache.get(contents), graph_id["chart"], render_mode, x_range)
+
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -11,8 +11,19 @@ UserId = str
 ObservationValue = int
 
 
+def _attributes(o) -> dict:
+    # The classes below use __slots__ to keep per-object memory down, so there is no __dict__
+    # to serialize; rebuild the same name -> value mapping (in assignment order) from the slots
+    slots = getattr(type(o), "__slots__", None)
+    if slots is None:
+        return o.__dict__
+    return {name: getattr(o, name) for name in slots}
+
+
 class Listing:
 
+    __slots__ = ("symbol", "product", "denomination")
+
     def __init__(self, symbol: Symbol, product: Product, denomination: Product):
         self.symbol = symbol
         self.product = product
@@ -21,6 +32,8 @@ class Listing:
                  
 class ConversionObservation:
 
+    __slots__ = ("bidPrice", "askPrice", "transportFees", "exportTariff", "importTariff", "sugarPrice", "sunlightIndex")
+
     def __init__(self, bidPrice: float, askPrice: float, transportFees: float, exportTariff: float, importTariff: float, sugarPrice: float, sunlightIndex: float):
         self.bidPrice = bidPrice
         self.askPrice = askPrice
@@ -33,6 +46,8 @@ class ConversionObservation:
 
 class Observation:
 
+    __slots__ = ("plainValueObservations", "conversionObservations")
+
     def __init__(self, plainValueObservations: Dict[Product, ObservationValue], conversionObservations: Dict[Product, ConversionObservation]) -> None:
         self.plainValueObservations = plainValueObservations
         self.conversionObservations = conversionObservations
@@ -43,6 +58,8 @@ class Observation:
 
 class Order:
 
+    __slots__ = ("symbol", "price", "quantity")
+
     def __init__(self, symbol: Symbol, price: int, quantity: int) -> None:
         self.symbol = symbol
         self.price = price
@@ -57,6 +74,8 @@ class Order:
 
 class OrderDepth:
 
+    __slots__ = ("buy_orders", "sell_orders")
+
     def __init__(self):
         self.buy_orders: Dict[int, int] = {}
         self.sell_orders: Dict[int, int] = {}
@@ -64,6 +83,8 @@ class OrderDepth:
 
 class Trade:
 
+    __slots__ = ("symbol", "price", "quantity", "buyer", "seller", "timestamp")
+
     def __init__(self, symbol: Symbol, price: int, quantity: int, buyer: UserId=None, seller: UserId=None, timestamp: int=0) -> None:
         self.symbol = symbol
         self.price: int = price
@@ -81,6 +102,8 @@ class Trade:
 
 class TradingState(object):
 
+    __slots__ = ("traderData", "timestamp", "listings", "order_depths", "own_trades", "market_trades", "position", "observations")
+
     def __init__(self,
                  traderData: str,
                  timestamp: Time,
@@ -100,10 +123,10 @@ class TradingState(object):
         self.observations = observations
         
     def toJSON(self):
-        return json.dumps(self, default=lambda o: o.__dict__, sort_keys=True)
+        return json.dumps(self, default=_attributes, sort_keys=True)
 
     
 class ProsperityEncoder(JSONEncoder):
 
         def default(self, o):
-            return o.__dict__
+            return _attributes(o)
@@ -0,0 +1,72 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept; every bucket in between contributes the point that
+    forms the largest triangle with the previously kept point and the next bucket's average, which
+    preserves spikes and turning points far better than striding. NaNs in y are treated as 0 when
+    ranking points, so leading NaNs (e.g. a rolling mean warm-up) don't poison a bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+
+    # Bucket edges over the interior points 1 .. n-2
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    # Each bucket's centroid is needed as the "next" point of the previous bucket
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[n - 1])
+    avg_y = np.append(sums_y / counts, y[n - 1])
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        px, py = x[previous], y[previous]
+        nx, ny = avg_x[bucket + 1], avg_y[bucket + 1]
+        areas = np.abs((px - nx) * (y[start:stop] - py) - (px - x[start:stop]) * (ny - py))
+        previous = start + int(np.argmax(areas))
+        indices[bucket + 1] = previous
+
+    return indices
+
+
+def visible_range(x: np.ndarray, x_range: Optional[Tuple[float, float]]) -> slice:
+    """Slice of the (sorted) x values inside x_range, padded by one point each side so lines reach the edges."""
+    if x_range is None:
+        return slice(0, len(x))
+
+    start = max(int(np.searchsorted(x, x_range[0], side="left")) - 1, 0)
+    stop = min(int(np.searchsorted(x, x_range[1], side="right")) + 1, len(x))
+    return slice(start, stop)
+
+
+def window_indices(x: np.ndarray, y: np.ndarray, threshold: int,
+                   x_range: Optional[Tuple[float, float]] = None) -> np.ndarray:
+    """Indices to plot for the visible part of a series: everything if it fits, LTTB otherwise."""
+    visible = visible_range(x, x_range)
+    return visible.start + lttb_indices(x[visible], y[visible], threshold)
+
+
+def relayout_range(relayout_data: Optional[dict]) -> Optional[Tuple[float, float]]:
+    """Extract the x-axis range from a dcc.Graph relayoutData event (None means show everything)."""
+    if not relayout_data or relayout_data.get("xaxis.autorange"):
+        return None
+    if "xaxis.range[0]" in relayout_data:
+        return float(relayout_data["xaxis.range[0]"]), float(relayout_data["xaxis.range[1]"])
+    if "xaxis.range" in relayout_data:
+        low, high = relayout_data["xaxis.range"]
+        return float(low), float(high)
+    return None
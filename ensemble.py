@@ -0,0 +1,238 @@
+import argparse
+import contextlib
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+import tick_cache
+import tick_stream
+from backtester import BacktestResult, Backtester, Book, day_files, load_trader
+from bench_traders import TRADERS
+from datamodel import Listing, Observation, OrderDepth, Symbol, Trade, TradingState
+from latency import StreamingQuantiles
+
+
+class Account:
+    """One strategy's side of an ensemble run: its own positions, cash, traderData and results.
+
+    `executor` is a data-less Backtester used for limit checks and matching, so every strategy is
+    filled exactly as it would be in a standalone backtest.
+    """
+
+    def __init__(self, name: str, trader: Any, executor: Backtester) -> None:
+        self.name = name
+        self.trader = trader
+        self.executor = executor
+        self.position: Dict[Symbol, int] = {}
+        self.cash: Dict[Symbol, float] = {}
+        self.trader_data = ""
+        self.own_trades: Dict[Symbol, List[Trade]] = {}
+        self.market_trades: Dict[Symbol, List[Trade]] = {}
+        self.result = BacktestResult()
+        self.latency = StreamingQuantiles()
+
+
+class EnsembleRunner(Backtester):
+    """Runs several Traders side by side over one pass of the market data.
+
+    Each tick the books are decoded, OrderDepths and the TradingState are built once and handed to
+    every strategy in turn with only its own traderData, position, own trades and market trades
+    swapped in, so Traders must treat the state as read-only (all the ones in this repo do).
+    Matching then works on per-strategy copies of just the books and prints each strategy traded
+    against. Results match running every Trader through its own Backtester.
+    """
+
+    def __init__(self,
+                 traders: Dict[str, Any],
+                 books: Optional[Dict[int, Dict[Symbol, Book]]] = None,
+                 trades: Optional[Dict[int, Dict[Symbol, List[Trade]]]] = None,
+                 position_limits: Dict[Symbol, int] = None,
+                 match_trades: bool = True,
+                 stream: Optional[Iterable[tick_stream.Snapshot]] = None) -> None:
+        super().__init__(None, books, trades, position_limits, match_trades, capture_output=False, stream=stream)
+        self.accounts = [
+            Account(name, trader, Backtester(trader, position_limits=position_limits, match_trades=match_trades))
+            for name, trader in traders.items()
+        ]
+        # Time spent outside Trader.run and matching: decoding books and building the shared state
+        self.shared_elapsed = 0.0
+
+    def run(self) -> Dict[str, BacktestResult]:
+        listings: Dict[Symbol, Listing] = {}
+        mid_prices: Dict[Symbol, float] = {}
+        start = time.perf_counter()
+        shared = 0.0
+
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for timestamp, snapshot, snapshot_trades in self.ticks():
+                decode_start = time.perf_counter()
+                order_depths = {}
+                for product, (buy_orders, sell_orders, mid_price) in snapshot.items():
+                    if product not in listings:
+                        listings[product] = Listing(product, product, "SEASHELLS")
+                        for account in self.accounts:
+                            account.position[product] = 0
+                            account.cash[product] = 0.0
+                    order_depth = OrderDepth()
+                    order_depth.buy_orders = buy_orders
+                    order_depth.sell_orders = sell_orders
+                    order_depths[product] = order_depth
+                    mid_prices[product] = mid_price
+
+                state = TradingState("", timestamp, listings, order_depths, {}, {}, {}, Observation({}, {}))
+                shared += time.perf_counter() - decode_start
+
+                for account in self.accounts:
+                    self._step(account, state, snapshot_trades, mid_prices)
+
+        elapsed = time.perf_counter() - start
+        self.shared_elapsed = shared
+        results = {}
+        for account in self.accounts:
+            result = account.result
+            result.elapsed = elapsed
+            result.position = dict(account.position)
+            result.product_pnl = {p: account.cash[p] + account.position[p] * mid_prices.get(p, 0.0) for p in account.cash}
+            results[account.name] = result
+        return results
+
+    def _step(self, account: Account, state: TradingState, snapshot_trades: Dict[Symbol, List[Trade]],
+              mid_prices: Dict[Symbol, float]) -> None:
+        state.traderData = account.trader_data
+        state.own_trades = account.own_trades
+        state.market_trades = account.market_trades
+        state.position = {product: quantity for product, quantity in account.position.items() if quantity != 0}
+
+        run_start = time.perf_counter()
+        orders, _, account.trader_data = account.trader.run(state)
+        account.latency.add(time.perf_counter() - run_start)
+
+        # Copy only what this strategy can consume: the books and prints of the products it traded
+        order_depths = {}
+        tick_trades = {}
+        for product in orders:
+            depth = state.order_depths.get(product)
+            if depth is None:
+                continue
+            copy = OrderDepth()
+            copy.buy_orders = dict(depth.buy_orders)
+            copy.sell_orders = dict(depth.sell_orders)
+            order_depths[product] = copy
+            if product in snapshot_trades:
+                tick_trades[product] = [Trade(t.symbol, t.price, t.quantity, t.buyer, t.seller, t.timestamp)
+                                        for t in snapshot_trades[product]]
+
+        result = account.result
+        account.own_trades, sandbox_log = account.executor.execute(
+            orders, order_depths, tick_trades, account.position, account.cash, state.timestamp)
+        for fills in account.own_trades.values():
+            result.own_trades.extend(fills)
+        result.sandbox_logs.append(sandbox_log)
+
+        # Untraded products' prints are shared, read-only, with every strategy
+        market_trades = dict(snapshot_trades)
+        for product, product_trades in tick_trades.items():
+            market_trades[product] = [t for t in product_trades if t.quantity > 0]
+        account.market_trades = market_trades
+
+        result.timestamps.append(state.timestamp)
+        cash, position = account.cash, account.position
+        result.pnl.append(sum(cash[p] + position[p] * mid_prices.get(p, 0.0) for p in cash))
+
+
+def parse_strategy(spec: str) -> Tuple[str, str, Dict[str, Any]]:
+    """"path" or "path:{json params}" -> (label, path, params)."""
+    path, _, params = spec.partition(":")
+    params = json.loads(params) if params else {}
+    label = os.path.basename(path) + (f" {json.dumps(params, separators=(',', ':'))}" if params else "")
+    return label, path, params
+
+
+def parse_strategies(specs: List[str]) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """parse_strategy for every spec; a repeated label gets " #2", " #3", ... so each copy runs on its own."""
+    parsed = []
+    seen: Dict[str, int] = {}
+    for spec in specs:
+        label, path, params = parse_strategy(spec)
+        seen[label] = seen.get(label, 0) + 1
+        parsed.append((label if seen[label] == 1 else f"{label} #{seen[label]}", path, params))
+    return parsed
+
+
+def table(runner: EnsembleRunner, results: Dict[str, BacktestResult]) -> pd.DataFrame:
+    """Side-by-side PnL, risk and Trader.run latency, one row per strategy."""
+    rows = []
+    for account in runner.accounts:
+        result, latency = results[account.name], account.latency
+        rows.append({
+            "strategy": account.name,
+            "pnl": result.final_pnl,
+            "max_drawdown": result.max_drawdown,
+            "fills": result.fills,
+            "run_p50_us": round(latency.quantile(0.5) * 1e6, 1),
+            "run_p99_us": round(latency.quantile(0.99) * 1e6, 1),
+            "run_max_us": round(latency.max * 1e6, 1),
+            "run_total_s": round(latency.total, 2),
+        })
+    return pd.DataFrame(rows).set_index("strategy")
+
+
+def run_alone(path: str, params: Dict[str, Any], prices_path: str, trades_path: str, match_trades: bool) -> BacktestResult:
+    """The same day through a standalone Backtester, decoding the books itself, for comparison."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        books = tick_cache.load_books(prices_path)
+        trades = tick_cache.load_market_trades(trades_path)
+        return Backtester(load_trader(path, **params), books, trades, match_trades=match_trades, capture_output=False).run()
+
+
+def _fills(result: BacktestResult) -> List[Tuple]:
+    return [(t.symbol, t.price, t.quantity, t.buyer, t.seller, t.timestamp) for t in result.own_trades]
+
+
+def same_result(a: BacktestResult, b: BacktestResult) -> bool:
+    return a.pnl == b.pnl and _fills(a) == _fills(b)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backtest several Traders side by side over one pass of the data.")
+    parser.add_argument("strategies", nargs="*", default=TRADERS,
+                        help='strategy files, optionally with constructor params: \'file.py:{"knob": 1}\'')
+    parser.add_argument("--data", default="./data/round1/")
+    parser.add_argument("--round", type=int, default=1)
+    parser.add_argument("--days", type=int, nargs="*", help="days to replay (default: all)")
+    parser.add_argument("--no-trade-matching", action="store_true", help="only fill against the visible book")
+    parser.add_argument("--compare", action="store_true",
+                        help="also run every strategy in its own Backtester, check the results agree and time it")
+    args = parser.parse_args()
+
+    specs = parse_strategies(args.strategies)
+    for day, prices_path, trades_path in day_files(args.data, args.round):
+        if args.days and day not in args.days:
+            continue
+
+        # Timed like run_alone below: loading the Traders and the day's data included
+        start = time.perf_counter()
+        traders = {label: load_trader(path, **params) for label, path, params in specs}
+        runner = EnsembleRunner(traders, tick_cache.load_books(prices_path), tick_cache.load_market_trades(trades_path),
+                                match_trades=not args.no_trade_matching)
+        results = runner.run()
+        elapsed = time.perf_counter() - start
+        print(f"Day {day}: {len(specs)} strategies in {elapsed:.2f}s, "
+              f"{runner.shared_elapsed:.2f}s of it building the shared state once for all of them")
+        with pd.option_context("display.width", 200, "display.max_columns", None):
+            print(table(runner, results).to_string())
+
+        if args.compare:
+            start = time.perf_counter()
+            mismatched = [label for label, path, params in specs
+                          if not same_result(run_alone(path, params, prices_path, trades_path, not args.no_trade_matching),
+                                             results[label])]
+            print(f"  separately: {time.perf_counter() - start:.2f}s; "
+                  + (f"results differ for {mismatched}" if mismatched else "identical PnL paths and fills"))
+
+
+if __name__ == "__main__":
+    main()
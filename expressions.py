@@ -0,0 +1,150 @@
+import ast
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import curve_fitting
+from curve_fitting import FitResult
+
+# The only names a formula may call, as bare names or as np.<name>
+FUNCTIONS: Dict[str, np.ufunc] = {
+    name: getattr(np, name) for name in (
+        "sin", "cos", "tan", "arcsin", "arccos", "arctan", "sinh", "cosh", "tanh",
+        "exp", "expm1", "log", "log1p", "log2", "log10", "sqrt", "cbrt", "square",
+        "abs", "absolute", "sign", "floor", "ceil", "round", "minimum", "maximum",
+    )
+}
+# Positional arguments per function; NumPy would take any extra one as the `out=` array to write into
+ARITY: Dict[str, int] = {name: getattr(func, "nin", 1) for name, func in FUNCTIONS.items()}
+CONSTANTS = {"pi": np.pi, "e": np.e}
+VARIABLE = "x"
+PARAMETERS = ("a", "b", "c", "d")
+
+_BINARY_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_UNARY_OPERATORS = (ast.UAdd, ast.USub)
+
+
+class ExpressionError(ValueError):
+    pass
+
+
+class _Validator(ast.NodeTransformer):
+    """Rejects anything but arithmetic on x, a..d, constants and whitelisted ufuncs.
+
+    np.<name> calls are rewritten to bare names, and integer literals become floats so
+    something like 9**9**9 overflows immediately instead of building a huge Python int.
+    """
+
+    def __init__(self) -> None:
+        self.parameters = set()
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        raise ExpressionError(f"{type(node).__name__} is not allowed")
+
+    def visit_Expression(self, node: ast.Expression) -> ast.AST:
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        if not isinstance(node.op, _BINARY_OPERATORS):
+            raise ExpressionError(f"operator {type(node.op).__name__} is not allowed")
+        node.left = self.visit(node.left)
+        node.right = self.visit(node.right)
+        return node
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        if not isinstance(node.op, _UNARY_OPERATORS):
+            raise ExpressionError(f"operator {type(node.op).__name__} is not allowed")
+        node.operand = self.visit(node.operand)
+        return node
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ExpressionError(f"constant {node.value!r} is not a number")
+        return ast.copy_location(ast.Constant(float(node.value)), node)
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id in PARAMETERS:
+            self.parameters.add(node.id)
+        elif node.id != VARIABLE and node.id not in CONSTANTS:
+            raise ExpressionError(f"unknown name {node.id!r}")
+        return node
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        func = node.func
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == "np":
+            name = func.attr
+        elif isinstance(func, ast.Name):
+            name = func.id
+        else:
+            raise ExpressionError("only functions like sin(...) or np.sin(...) can be called")
+        if name not in FUNCTIONS:
+            raise ExpressionError(f"function {name!r} is not allowed")
+        if node.keywords:
+            raise ExpressionError("keyword arguments are not allowed")
+        if len(node.args) != ARITY[name]:
+            raise ExpressionError(f"{name}() takes {ARITY[name]} argument{'s' if ARITY[name] > 1 else ''}")
+
+        node.func = ast.copy_location(ast.Name(name, ast.Load()), func)
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+
+class Expression:
+    """A validated formula in x and the optional parameters a..d, compiled once."""
+
+    def __init__(self, text: str) -> None:
+        validator = _Validator()
+        try:
+            tree = ast.parse(text.strip(), mode="eval")
+            tree = ast.fix_missing_locations(validator.visit(tree))
+            self._code = compile(tree, "<expression>", "eval")
+        except SyntaxError as e:
+            raise ExpressionError(f"invalid syntax: {e.msg}") from None
+        except (RecursionError, MemoryError):
+            raise ExpressionError("expression is too long or too deeply nested") from None
+        except ExpressionError:
+            raise
+        except ValueError as e:
+            # e.g. null bytes in the source
+            raise ExpressionError(f"invalid expression: {e}") from None
+
+        self.text = text
+        # Parameters are passed positionally in a..d order, skipping the ones the formula doesn't use
+        self.parameters: Tuple[str, ...] = tuple(p for p in PARAMETERS if p in validator.parameters)
+        self._namespace = {"__builtins__": {}, **FUNCTIONS, **CONSTANTS}
+
+    def __call__(self, x: np.ndarray, *params: float) -> np.ndarray:
+        scope = dict(zip(self.parameters, params))
+        scope[VARIABLE] = x
+        with np.errstate(all="ignore"):
+            result = eval(self._code, self._namespace, scope)
+        return np.broadcast_to(np.asarray(result, dtype=np.float64), np.shape(x))
+
+    def evaluate_many(self, xs: List[np.ndarray], params: Optional[List[float]] = None) -> List[np.ndarray]:
+        """Evaluate over several x arrays with a single pass over their concatenation."""
+        if not xs:
+            return []
+        values = self(np.concatenate(xs), *(params or ()))
+        return np.split(values, np.cumsum([len(x) for x in xs])[:-1])
+
+    def fit(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if not self.parameters:
+            return np.empty(0), self(x)
+        return curve_fitting.fit_model(self, x, y, [1.0] * len(self.parameters))
+
+    def fit_many(self, xs: List[np.ndarray], ys: List[np.ndarray]) -> List[FitResult]:
+        """(popt, values) per series: fitted in parallel if the formula has parameters, else just evaluated."""
+        if not self.parameters:
+            try:
+                return [(np.empty(0), values) for values in self.evaluate_many(xs)]
+            except Exception as e:
+                return [e] * len(xs)
+        return curve_fitting.map_fits(self.fit, xs, ys)
+
+
+@lru_cache(maxsize=256)
+def compile_expression(text: str) -> Expression:
+    """Parse and validate a formula, reusing the compiled form for text seen before."""
+    return Expression(text)
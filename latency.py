@@ -0,0 +1,161 @@
+import json
+import math
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+# Histogram buckets grow by 5% from 1us up to 10s, so percentiles are within ~2.5% of the true value
+_MIN_SECONDS = 1e-6
+_RATIO = 1.05
+_LOG_RATIO = math.log(_RATIO)
+_BUCKETS = int(math.log(10.0 / _MIN_SECONDS) / _LOG_RATIO) + 2
+
+_NULL = nullcontext()
+
+T = TypeVar("T")
+
+
+class StreamingQuantiles:
+    """Constant-memory latency distribution: count, total, max and log-bucketed percentiles."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        index = int(math.log(seconds / _MIN_SECONDS) / _LOG_RATIO) + 1 if seconds > _MIN_SECONDS else 0
+        self.counts[min(index, _BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1) + 1
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                # Geometric middle of the bucket, never above the largest value actually seen
+                upper = _MIN_SECONDS * _RATIO ** index
+                return min(upper / math.sqrt(_RATIO) if index else _MIN_SECONDS, self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class Profiler:
+    """Opt-in wall-clock timings for named phases of Trader.run, optionally split per product.
+
+    Disabled (the default), phase() hands back a shared no-op context manager and products() returns
+    the iterable untouched, so instrumented code pays for little more than an attribute lookup.
+    Every `report_every` ticks tick() returns a one-line summary and, if `sidecar` is set, rewrites
+    that file with the full table as JSON.
+    """
+
+    def __init__(self, enabled: bool = False, report_every: int = 1000, sidecar: Optional[str] = None) -> None:
+        self.enabled = enabled
+        self.report_every = report_every
+        self.sidecar = sidecar
+        self.stats: Dict[str, StreamingQuantiles] = {}
+        self.ticks = 0
+
+    def record(self, key: str, seconds: float) -> None:
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = StreamingQuantiles()
+        stats.add(seconds)
+
+    def phase(self, name: str, product: Optional[str] = None):
+        """Context manager timing one phase (recorded as "name" or "name:product")."""
+        if not self.enabled:
+            return _NULL
+        return self._timed(name if product is None else f"{name}:{product}")
+
+    @contextmanager
+    def _timed(self, key: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(key, time.perf_counter() - start)
+
+    def products(self, name: str, items: Iterable[Tuple[str, T]]) -> Iterable[Tuple[str, T]]:
+        """Wrap a `for product, ... in items` loop so each iteration's body is timed as "name:product"."""
+        if not self.enabled:
+            return items
+        return self._timed_items(name, items)
+
+    def _timed_items(self, name: str, items: Iterable[Tuple[str, T]]) -> Iterator[Tuple[str, T]]:
+        # The body runs between yield and the next resume, `continue` included
+        for item in items:
+            start = time.perf_counter()
+            yield item
+            self.record(f"{name}:{item[0]}", time.perf_counter() - start)
+
+    def tick(self) -> Optional[str]:
+        """Count a finished tick; returns the summary line when a report is due."""
+        if not self.enabled:
+            return None
+        self.ticks += 1
+        if self.ticks % self.report_every:
+            return None
+
+        if self.sidecar:
+            with open(self.sidecar, "w") as f:
+                json.dump({"ticks": self.ticks, "phases": self.summary()}, f, indent=1)
+        return self.summary_text()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per phase: calls, mean/p50/p99/max in microseconds, slowest p99 first."""
+        rows = {
+            key: {
+                "count": stats.count,
+                "mean_us": round(stats.mean * 1e6, 1),
+                "p50_us": round(stats.quantile(0.5) * 1e6, 1),
+                "p99_us": round(stats.quantile(0.99) * 1e6, 1),
+                "max_us": round(stats.max * 1e6, 1),
+            }
+            for key, stats in self.stats.items()
+        }
+        return dict(sorted(rows.items(), key=lambda item: -item[1]["p99_us"]))
+
+    def summary_text(self, limit: int = 12) -> str:
+        rows: List[str] = [
+            f"{key} {row['p50_us']:.0f}/{row['p99_us']:.0f}/{row['max_us']:.0f}"
+            for key, row in list(self.summary().items())[:limit]
+        ]
+        return f"latency us p50/p99/max after {self.ticks} ticks: " + ", ".join(rows)
+
+
+def timed(name: str, report: Optional[Callable[[Any, str], None]] = None) -> Callable:
+    """Decorate a method of an object with a `profiler` attribute: times each call as `name` and
+    counts a tick, passing due summaries to report(self, text) (print by default)."""
+    def decorator(method: Callable) -> Callable:
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            profiler: Profiler = self.profiler
+            if not profiler.enabled:
+                return method(self, *args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                profiler.record(name, time.perf_counter() - start)
+                text = profiler.tick()
+                if text is not None:
+                    (report or (lambda _, line: print(line)))(self, text)
+
+        return wrapper
+
+    return decorator
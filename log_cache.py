@@ -0,0 +1,125 @@
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import log_reader
+
+DEFAULT_MAX_BYTES = 512 * 2 ** 20
+
+
+class ProductSeries:
+    """One product's activity rows sorted by timestamp, as plain arrays ready for plotting/fitting."""
+
+    def __init__(self, product_df: pd.DataFrame) -> None:
+        product_df = product_df.sort_values("timestamp")
+        self.timestamp = product_df["timestamp"].to_numpy()
+        self.mid_price = product_df["mid_price"].to_numpy(dtype=np.float64)
+        self.sma_10 = product_df["mid_price"].rolling(window=10).mean().to_numpy()
+        self.x = np.arange(len(self.timestamp))
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamp.nbytes + self.mid_price.nbytes + self.sma_10.nbytes + self.x.nbytes
+
+
+class CachedLog:
+    """Everything derived from one uploaded log: parsed frames, per-product series and fit results."""
+
+    def __init__(self, sandbox_logs: List[Any], activities_df: pd.DataFrame, trades_df: pd.DataFrame) -> None:
+        self.sandbox_logs = sandbox_logs
+        self.activities_df = activities_df
+        self.trades_df = trades_df
+        self.series: Dict[str, ProductSeries] = {}
+        self.fits: Dict[Tuple[str, str], Any] = {}
+        self.nbytes = 0
+
+        if not activities_df.empty:
+            for product, product_df in activities_df.groupby("product", sort=False):
+                self.series[product] = ProductSeries(product_df)
+
+        self.nbytes = (
+            int(activities_df.memory_usage(deep=True).sum())
+            + int(trades_df.memory_usage(deep=True).sum())
+            + sum(series.nbytes for series in self.series.values())
+            + 200 * len(sandbox_logs)
+        )
+
+    @property
+    def products(self) -> List[str]:
+        return list(self.series.keys())
+
+    def fit(self, product: str, function: str, compute: Callable[[ProductSeries], Any]) -> Any:
+        """Return the cached fit of `function` for `product`, computing it on first request."""
+        key = (product, function)
+        if key not in self.fits:
+            result = compute(self.series[product])
+            self.fits[key] = result
+            self.nbytes += sum(getattr(value, "nbytes", 64) for value in (result if isinstance(result, tuple) else (result,)))
+        return self.fits[key]
+
+    def fit_all(self, function: str, compute: Callable[[List[ProductSeries]], List[Any]]) -> None:
+        """Fill in `function` for every product not fitted yet with one batched compute call.
+
+        compute returns one result per series; exceptions are not cached, so fit() retries them.
+        """
+        missing = [product for product in self.series if (product, function) not in self.fits]
+        if not missing:
+            return
+
+        for product, result in zip(missing, compute([self.series[product] for product in missing])):
+            if not isinstance(result, Exception):
+                self.fit(product, function, lambda _: result)
+
+
+class LogCache:
+    """LRU cache of CachedLog entries keyed by a hash of the upload, bounded by estimated memory."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, CachedLog]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(contents: str) -> str:
+        return hashlib.blake2b(contents.encode("ascii", "ignore"), digest_size=16).hexdigest()
+
+    def get(self, contents: str) -> CachedLog:
+        key = self.key(contents)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                return entry
+
+        # Parse outside the lock so other sessions are not blocked; a duplicate parse is harmless
+        entry = parse_contents(contents)
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            self._evict()
+        return entry
+
+    def _evict(self) -> None:
+        # Fit results grow entries after insertion, so the budget is re-checked on every insert
+        total = sum(entry.nbytes for entry in self.entries.values())
+        while total > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            total -= evicted.nbytes
+
+    def peek(self, contents: str) -> Optional[CachedLog]:
+        with self.lock:
+            return self.entries.get(self.key(contents))
+
+
+def parse_contents(contents: str) -> CachedLog:
+    """Decode a dcc.Upload data URL and parse the log it holds."""
+    _, content_string = contents.split(",", 1)
+    parsed = log_reader.read_bytes(base64.b64decode(content_string), decode_lambda=False)
+    activities_df = parsed.activities_frame() if parsed.activities else pd.DataFrame()
+    trades_df = parsed.trades_frame() if parsed.trades else pd.DataFrame()
+    return CachedLog(parsed.sandbox, activities_df, trades_df)
@@ -0,0 +1,322 @@
+import io
+import json
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from datamodel import ConversionObservation, Listing, Observation, OrderDepth, Trade, TradingState
+
+SANDBOX = "sandbox"
+ACTIVITIES = "activities"
+TRADES = "trades"
+
+_SECTION_HEADERS = (
+    ("Sandbox logs", SANDBOX),
+    ("Activities log", ACTIVITIES),
+    ("Trade History", TRADES),
+)
+
+
+class SandboxEntry(NamedTuple):
+    timestamp: int
+    sandbox_log: str
+    lambda_log: str
+
+
+class ActivityRow(NamedTuple):
+    day: int
+    timestamp: int
+    product: str
+    bid_price_1: Optional[int]
+    bid_volume_1: Optional[int]
+    bid_price_2: Optional[int]
+    bid_volume_2: Optional[int]
+    bid_price_3: Optional[int]
+    bid_volume_3: Optional[int]
+    ask_price_1: Optional[int]
+    ask_volume_1: Optional[int]
+    ask_price_2: Optional[int]
+    ask_volume_2: Optional[int]
+    ask_price_3: Optional[int]
+    ask_volume_3: Optional[int]
+    mid_price: float
+    profit_and_loss: float
+
+
+class TradeRecord(NamedTuple):
+    timestamp: int
+    buyer: str
+    seller: str
+    symbol: str
+    currency: str
+    price: float
+    quantity: int
+
+
+Record = Union[SandboxEntry, ActivityRow, TradeRecord]
+
+
+def _int_or_none(value: str) -> Optional[int]:
+    return int(float(value)) if value else None
+
+
+def _activity(line: str) -> ActivityRow:
+    fields = line.split(";")
+    return ActivityRow(
+        int(fields[0]),
+        int(fields[1]),
+        fields[2],
+        *(_int_or_none(value) for value in fields[3:15]),
+        float(fields[15]) if fields[15] else float("nan"),
+        float(fields[16]) if fields[16] else 0.0,
+    )
+
+
+def _trade(field_lines: List[str]) -> TradeRecord:
+    # Some exports leave a trailing comma after the last field, so rebuild the object ourselves
+    data = json.loads("{" + ",".join(line.strip().rstrip(",") for line in field_lines) + "}")
+    return TradeRecord(
+        data.get("timestamp", 0),
+        data.get("buyer", ""),
+        data.get("seller", ""),
+        data.get("symbol", ""),
+        data.get("currency", ""),
+        data.get("price", 0),
+        data.get("quantity", 0),
+    )
+
+
+def iter_records(lines: Iterable[str]) -> Iterator[Tuple[str, Record]]:
+    """Yield (section, record) pairs from the lines of a submission log, one entry at a time.
+
+    Only the lines of the entry being parsed are held in memory, so arbitrarily long logs stream
+    with constant memory.
+    """
+    section = None
+    buffer: List[str] = []
+    header_seen = False
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+        stripped = line.strip()
+        if not stripped:
+            continue
+
+        for prefix, name in _SECTION_HEADERS:
+            if stripped.startswith(prefix):
+                section = name
+                buffer = []
+                header_seen = False
+                break
+        else:
+            if section == SANDBOX:
+                if line == "{":
+                    buffer = []
+                elif line == "}":
+                    entry = json.loads("{" + "".join(buffer) + "}")
+                    yield SANDBOX, SandboxEntry(entry.get("timestamp", 0), entry.get("sandboxLog", ""), entry.get("lambdaLog", ""))
+                else:
+                    buffer.append(line)
+
+            elif section == ACTIVITIES:
+                if not header_seen:
+                    header_seen = True
+                else:
+                    yield ACTIVITIES, _activity(line)
+
+            elif section == TRADES:
+                if stripped in ("[", "{", "[{"):
+                    buffer = []
+                elif stripped.startswith("}"):
+                    if buffer:
+                        yield TRADES, _trade(buffer)
+                    buffer = []
+                elif stripped not in ("]",):
+                    buffer.append(stripped)
+
+
+def iter_log(source: Union[str, TextIO]) -> Iterator[Tuple[str, Record]]:
+    """Stream records from a log path or an open text file."""
+    if isinstance(source, str):
+        with open(source, encoding="utf-8") as f:
+            yield from iter_records(f)
+    else:
+        yield from iter_records(source)
+
+
+def decode_lambda_log(lambda_log: str) -> Optional[List[Any]]:
+    """Return the Logger.flush payload inside a lambdaLog, or None if there isn't one.
+
+    Plain print() output can precede it, so this looks for the last line that starts with "[[".
+    The payload is [compressed_state, orders, conversions, trader_data, logs], where
+    compressed_state is [timestamp, traderData, listings, order_depths, own_trades, market_trades,
+    position, observations].
+    """
+    start = lambda_log.rfind("\n[[")
+    start = start + 1 if start >= 0 else (0 if lambda_log.startswith("[[") else -1)
+    if start < 0:
+        return None
+
+    try:
+        return json.loads(lambda_log[start:])
+    except ValueError:
+        return None
+
+
+def _trades_by_symbol(rows: List[List[Any]]) -> Dict[str, List[Trade]]:
+    trades: Dict[str, List[Trade]] = {}
+    for symbol, price, quantity, buyer, seller, timestamp in rows:
+        trades.setdefault(symbol, []).append(Trade(symbol, price, quantity, buyer, seller, timestamp))
+    return trades
+
+
+def decode_state(compressed: List[Any]) -> TradingState:
+    """Rebuild the TradingState a Logger.flush payload's compressed_state was made from.
+
+    JSON turned the order-depth prices into strings; they are ints again here. Conversion
+    observations are restored positionally, in the order Logger.compress_observations wrote them.
+    """
+    timestamp, trader_data, listings, order_depths, own_trades, market_trades, position, observations = compressed
+
+    depths = {}
+    for symbol, (buy_orders, sell_orders) in order_depths.items():
+        depth = OrderDepth()
+        depth.buy_orders = {int(price): volume for price, volume in buy_orders.items()}
+        depth.sell_orders = {int(price): volume for price, volume in sell_orders.items()}
+        depths[symbol] = depth
+
+    plain, conversions = observations
+    return TradingState(
+        trader_data,
+        timestamp,
+        {symbol: Listing(symbol, product, denomination) for symbol, product, denomination in listings},
+        depths,
+        _trades_by_symbol(own_trades),
+        _trades_by_symbol(market_trades),
+        dict(position),
+        Observation(dict(plain), {product: ConversionObservation(*values) for product, values in conversions.items()}),
+    )
+
+
+class LambdaColumns:
+    """Accumulates decoded lambdaLog payloads into columnar arrays.
+
+    Symbols and counterparties are stored as codes into `strings`; book volumes keep the
+    OrderDepth sign convention (asks negative).
+    """
+
+    def __init__(self) -> None:
+        self.strings: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self.books: Dict[str, List[int]] = {"timestamp": [], "symbol": [], "price": [], "volume": []}
+        self.own_trades: Dict[str, List] = {
+            "timestamp": [], "symbol": [], "price": [], "quantity": [], "buyer": [], "seller": [], "trade_timestamp": [],
+        }
+        self.orders: Dict[str, List] = {"timestamp": [], "symbol": [], "price": [], "quantity": []}
+        self.positions: Dict[str, List[int]] = {"timestamp": [], "symbol": [], "position": []}
+
+    def _code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def add(self, payload: List[Any]) -> None:
+        state, orders = payload[0], payload[1]
+        timestamp, order_depths, own_trades, position = state[0], state[3], state[4], state[6]
+
+        books = self.books
+        for symbol, (buy_orders, sell_orders) in order_depths.items():
+            code = self._code(symbol)
+            for side in (buy_orders, sell_orders):
+                for price, volume in side.items():
+                    books["timestamp"].append(timestamp)
+                    books["symbol"].append(code)
+                    books["price"].append(int(price))
+                    books["volume"].append(volume)
+
+        trades = self.own_trades
+        for symbol, price, quantity, buyer, seller, trade_timestamp in own_trades:
+            trades["timestamp"].append(timestamp)
+            trades["symbol"].append(self._code(symbol))
+            trades["price"].append(price)
+            trades["quantity"].append(quantity)
+            trades["buyer"].append(self._code(buyer or ""))
+            trades["seller"].append(self._code(seller or ""))
+            trades["trade_timestamp"].append(trade_timestamp)
+
+        for symbol, price, quantity in orders:
+            self.orders["timestamp"].append(timestamp)
+            self.orders["symbol"].append(self._code(symbol))
+            self.orders["price"].append(price)
+            self.orders["quantity"].append(quantity)
+
+        for symbol, quantity in position.items():
+            self.positions["timestamp"].append(timestamp)
+            self.positions["symbol"].append(self._code(symbol))
+            self.positions["position"].append(quantity)
+
+    def arrays(self) -> Dict[str, Dict[str, np.ndarray]]:
+        def convert(columns: Dict[str, List], float_columns: Tuple[str, ...] = ()) -> Dict[str, np.ndarray]:
+            return {
+                name: np.asarray(values, dtype=np.float64 if name in float_columns else np.int64)
+                for name, values in columns.items()
+            }
+
+        return {
+            "books": convert(self.books),
+            "own_trades": convert(self.own_trades, ("price",)),
+            "orders": convert(self.orders),
+            "positions": convert(self.positions),
+        }
+
+
+class ParsedLog:
+    def __init__(self) -> None:
+        self.sandbox: List[SandboxEntry] = []
+        self.activities: List[ActivityRow] = []
+        self.trades: List[TradeRecord] = []
+        self.lambda_columns = LambdaColumns()
+
+    def activities_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.activities, columns=ActivityRow._fields)
+
+    def trades_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.trades, columns=TradeRecord._fields)
+
+
+def read_log(source: Union[str, TextIO], decode_lambda: bool = True) -> ParsedLog:
+    """Parse a whole log into lists/arrays. Use iter_log directly to keep memory bounded."""
+    parsed = ParsedLog()
+    for section, record in iter_log(source):
+        if section == SANDBOX:
+            parsed.sandbox.append(record)
+            if decode_lambda and record.lambda_log:
+                payload = decode_lambda_log(record.lambda_log)
+                if payload is not None:
+                    parsed.lambda_columns.add(payload)
+        elif section == ACTIVITIES:
+            parsed.activities.append(record)
+        else:
+            parsed.trades.append(record)
+
+    return parsed
+
+
+def read_bytes(data: bytes, decode_lambda: bool = True) -> ParsedLog:
+    return read_log(io.TextIOWrapper(io.BytesIO(data), encoding="utf-8"), decode_lambda)
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        start = time.perf_counter()
+        parsed = read_log(path)
+        elapsed = time.perf_counter() - start
+        arrays = parsed.lambda_columns.arrays()
+        print(f"{path}: {len(parsed.sandbox)} sandbox entries, {len(parsed.activities)} activity rows, "
+              f"{len(parsed.trades)} trades, {len(arrays['books']['timestamp'])} decoded book levels "
+              f"in {elapsed:.3f}s")
@@ -0,0 +1,229 @@
+import argparse
+import atexit
+import glob
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+
+import tick_cache
+from datamodel import Symbol
+
+# Segment names are PREFIX<server pid>_<server serial>_<table index>, so stale ones can be traced to their owner
+PREFIX = "tickshm_"
+SHM_DIR = "/dev/shm"
+
+_serial = itertools.count()
+
+
+class SharedTable(NamedTuple):
+    """Everything a worker needs to rebuild a TickTable over one shared segment; cheap to pickle.
+
+    The segment holds the int32 columns as one (len(int_columns), rows) matrix followed by the
+    float64 columns as another, 8-byte aligned.
+    """
+    segment: str
+    rows: int
+    int_columns: List[str]
+    float_columns: List[str]
+    strings: List[str]
+    key: str
+    ranges: Dict[Symbol, Tuple[int, int]]
+
+    @property
+    def float_offset(self) -> int:
+        return (len(self.int_columns) * self.rows * 4 + 7) // 8 * 8
+
+    @property
+    def size(self) -> int:
+        return self.float_offset + len(self.float_columns) * self.rows * 8
+
+
+def _views(spec: SharedTable, buffer) -> Tuple[np.ndarray, np.ndarray]:
+    ints = np.ndarray((len(spec.int_columns), spec.rows), dtype=np.int32, buffer=buffer)
+    floats = np.ndarray((len(spec.float_columns), spec.rows), dtype=np.float64, buffer=buffer, offset=spec.float_offset)
+    return ints, floats
+
+
+def _table(spec: SharedTable, buffer) -> tick_cache.TickTable:
+    ints, floats = _views(spec, buffer)
+    columns = {column: ints[i] for i, column in enumerate(spec.int_columns)}
+    columns.update({column: floats[i] for i, column in enumerate(spec.float_columns)})
+    return tick_cache.TickTable(columns, spec.strings, spec.key, spec.ranges)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def release_stale() -> List[str]:
+    """Unlink segments left behind by servers that died without cleaning up (e.g. SIGKILL); returns their names."""
+    if not os.path.isdir(SHM_DIR):
+        return []
+
+    released = []
+    for name in os.listdir(SHM_DIR):
+        if not name.startswith(PREFIX):
+            continue
+        try:
+            pid = int(name[len(PREFIX):].split("_", 1)[0])
+        except ValueError:
+            continue
+        if pid == os.getpid() or _alive(pid):
+            continue
+        try:
+            segment = shared_memory.SharedMemory(name)
+        except FileNotFoundError:
+            continue
+        segment.close()
+        segment.unlink()
+        released.append(name)
+    return released
+
+
+class MarketDataServer:
+    """Copies the columns of each prices/trades CSV into shared memory once, for worker processes to map.
+
+    Paths that don't exist (days without a trades file) are skipped.
+
+    `manifest` maps every CSV path to its SharedTable; hand it to attach() in each worker (e.g. as a
+    ProcessPoolExecutor initializer) and call table(path) there. Segments are unlinked by close(),
+    on leaving the `with` block, at interpreter exit, and, if this process is killed outright, by
+    multiprocessing's resource tracker; release_stale() at start-up catches anything that outlived both.
+    """
+
+    def __init__(self, paths: Iterable[str]) -> None:
+        release_stale()
+        self.segments: List[shared_memory.SharedMemory] = []
+        self.manifest: Dict[str, SharedTable] = {}
+        serial = next(_serial)
+        atexit.register(self.close)
+
+        try:
+            for path in paths:
+                if os.path.exists(path) and path not in self.manifest:
+                    self.manifest[path] = self._share(path, f"{PREFIX}{os.getpid()}_{serial}_{len(self.segments)}")
+        except BaseException:
+            self.close()
+            raise
+
+    def _share(self, path: str, name: str) -> SharedTable:
+        source = tick_cache.load(path)
+        int_columns = [column for column, values in source.columns.items() if values.dtype == np.int32]
+        float_columns = [column for column, values in source.columns.items() if values.dtype == np.float64]
+        spec = SharedTable(name, len(source), int_columns, float_columns, source.strings, source.key, source.ranges)
+
+        segment = shared_memory.SharedMemory(name, create=True, size=max(spec.size, 1))
+        self.segments.append(segment)
+        ints, floats = _views(spec, segment.buf)
+        for i, column in enumerate(int_columns):
+            ints[i] = source[column]
+        for i, column in enumerate(float_columns):
+            floats[i] = source[column]
+        # The views must go before the segment can be closed
+        del ints, floats
+        return spec
+
+    @property
+    def nbytes(self) -> int:
+        return sum(spec.size for spec in self.manifest.values())
+
+    def close(self) -> None:
+        segments, self.segments = self.segments, []
+        for segment in segments:
+            segment.close()
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+        atexit.unregister(self.close)
+
+    def __enter__(self) -> "MarketDataServer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# Worker side: the manifest from attach() and the segments mapped so far, kept for the process lifetime
+_manifest: Dict[str, SharedTable] = {}
+_attached: Dict[str, Tuple[shared_memory.SharedMemory, tick_cache.TickTable]] = {}
+
+
+def attach(manifest: Dict[str, SharedTable]) -> None:
+    """Make a server's tables available to table() in this process (a pool initializer)."""
+    _manifest.clear()
+    _manifest.update(manifest)
+    _attached.clear()
+
+
+def attached() -> bool:
+    return bool(_manifest)
+
+
+def table(path: str) -> tick_cache.TickTable:
+    """Zero-copy TickTable over the shared copy of `path`; drop-in for tick_cache.load in workers."""
+    entry = _attached.get(path)
+    if entry is None:
+        spec = _manifest.get(path)
+        if spec is None:
+            raise FileNotFoundError(path)
+        segment = shared_memory.SharedMemory(spec.segment)
+        entry = _attached[path] = (segment, _table(spec, segment.buf))
+    return entry[1]
+
+
+def _memory_kib() -> Dict[str, int]:
+    # Private (anonymous) and shared-memory resident set of this process, from /proc
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in ("RssAnon", "RssShmem"):
+                fields[name] = int(value.split()[0])
+    return fields
+
+
+def _touch_all(paths: List[str]) -> Dict[str, int]:
+    before = _memory_kib()
+    checksum = 0.0
+    for path in paths:
+        for values in table(path).columns.values():
+            checksum += float(np.sum(values, dtype=np.float64))
+    after = _memory_kib()
+    return {"private_kib": after["RssAnon"] - before["RssAnon"], "shared_kib": after["RssShmem"], "checksum": checksum}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Share round data with worker processes and report their memory.")
+    parser.add_argument("folders", nargs="*", default=["./data/round1/", "./data/round3/"])
+    parser.add_argument("--workers", type=int, default=32)
+    args = parser.parse_args()
+
+    paths = [path for folder in args.folders for path in sorted(glob.glob(os.path.join(folder, "*_round_*_day_*.csv")))]
+    start = time.perf_counter()
+    with MarketDataServer(paths) as server:
+        print(f"{len(server.manifest)} tables, {server.nbytes / 2 ** 20:.1f} MiB shared in {time.perf_counter() - start:.2f}s")
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=attach, initargs=(server.manifest,)) as executor:
+            rows = list(executor.map(_touch_all, [list(server.manifest)] * args.workers))
+
+    private = [row["private_kib"] for row in rows]
+    print(f"{args.workers} workers read every column: extra private memory per worker "
+          f"{np.mean(private):.0f} KiB mean / {max(private)} KiB max, "
+          f"shared mapped {rows[0]['shared_kib'] / 1024:.1f} MiB each, checksums agree: "
+          f"{len({row['checksum'] for row in rows}) == 1}")
+    leftover = [name for name in os.listdir(SHM_DIR) if name.startswith(PREFIX)] if os.path.isdir(SHM_DIR) else []
+    print(f"segments left after shutdown: {len(leftover)}")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 import json
-from typing import Any, List, Dict
+from typing import Any, List
 
 from datamodel import Listing, Observation, Order, OrderDepth, ProsperityEncoder, Symbol, Trade, TradingState
+from latency import Profiler, timed
+from order_book import OrderBook
+from rolling_stats import RollingStats
 
 
 class Logger:
@@ -13,31 +16,35 @@ class Logger:
         self.logs += sep.join(map(str, objects)) + end
 
     def flush(self, state: TradingState, orders: dict[Symbol, list[Order]], conversions: int, trader_data: str) -> None:
-        base_length = len(
-            self.to_json(
-                [
-                    self.compress_state(state, ""),
-                    self.compress_orders(orders),
-                    conversions,
-                    "",
-                    "",
-                ]
-            )
+        # Encode everything except the three free-text fields once, then splice the truncated
+        # strings into the gaps. The result is byte-identical to encoding the whole list:
+        # [[timestamp, traderData, *state], orders, conversions, trader_data, logs]
+        compressed_state = self.compress_state(state, "")
+        head = "[[" + self.to_json(compressed_state[0]) + ","
+        middle = (
+            ","
+            + self.to_json(compressed_state[2:])[1:]
+            + ","
+            + self.to_json(self.compress_orders(orders))
+            + ","
+            + self.to_json(conversions)
+            + ","
         )
 
+        # Length with all three strings empty ('""' each, plus the "," and "]" around the last two)
+        base_length = len(head) + len(middle) + 8
+
         # We truncate state.traderData, trader_data, and self.logs to the same max. length to fit the log limit
         max_item_length = (self.max_log_length - base_length) // 3
 
         print(
-            self.to_json(
-                [
-                    self.compress_state(state, self.truncate(state.traderData, max_item_length)),
-                    self.compress_orders(orders),
-                    conversions,
-                    self.truncate(trader_data, max_item_length),
-                    self.truncate(self.logs, max_item_length),
-                ]
-            )
+            head
+            + self.to_json(self.truncate(state.traderData, max_item_length))
+            + middle
+            + self.to_json(self.truncate(trader_data, max_item_length))
+            + ","
+            + self.to_json(self.truncate(self.logs, max_item_length))
+            + "]"
         )
 
         self.logs = ""
@@ -122,66 +129,57 @@ logger = Logger()
 
 
 class Trader:
-    def __init__(self):
-        self.price_history: Dict[str, List[float]] = {}
-        self.max_history_length = 7  # Use last 8 mid-prices for averaging
+    def __init__(self, max_history_length: int = 7, order_size: int = 20, profile: bool = False):
+        self.price_history = RollingStats(max_history_length)
+        # Opt-in per-phase timings (latency.py); a summary is printed every 1000 ticks
+        self.profiler = Profiler(enabled=profile)
+        self.max_history_length = max_history_length  # Use last 8 mid-prices for averaging
+        self.order_size = order_size
+    @timed("run")
     def run(self, state: TradingState) -> tuple[dict[Symbol, list[Order]], int, str]:
         result = {}
         conversions = 0
         trader_data = ""
 
-        if state.traderData:
-            try:
-                loaded_data = json.loads(state.traderData)
-                self.price_history = {
-                    k: v[-self.max_history_length:] for k, v in loaded_data.items()
-                }
-            except Exception as e:
-                print("Failed to load traderData:", e)
+        with self.profiler.phase("restore"):
+            if state.traderData:
+                try:
+                    self.price_history.restore(state.traderData)
+                except Exception as e:
+                    print("Failed to load traderData:", e)
 
-        for product, order_depth in state.order_depths.items():
+        for product, order_depth in self.profiler.products("product", state.order_depths.items()):
             if product == "SQUID_INK":
                 continue
 
             orders: List[Order] = []
 
-            best_bid = max(order_depth.buy_orders.keys()) if order_depth.buy_orders else None
-            best_ask = min(order_depth.sell_orders.keys()) if order_depth.sell_orders else None
-
-            if best_bid is not None and best_ask is not None:
-                mid_price = (best_bid + best_ask) / 2
-
-                if product not in self.price_history:
-                    self.price_history[product] = []
+            book = OrderBook(order_depth)
 
-                # Add the new price and maintain history length manually
-                self.price_history[product].append(mid_price)
-                if len(self.price_history[product]) > self.max_history_length:
-                    self.price_history[product].pop(0)  # Remove the oldest price
+            if book.two_sided:
+                mid_price = book.mid
 
-                fair_value = sum(self.price_history[product]) / len(self.price_history[product])
+                fair_value = self.price_history.update(product, mid_price).mean
 
                 # Handle buy orders
-                for ask_price, ask_volume in sorted(order_depth.sell_orders.items()):
-                    if ask_price < fair_value:
-                        buy_volume = min(-ask_volume, 20)  # Limit order size
-                        print(f"[{product}] BUY {buy_volume} @ {ask_price}")
-                        orders.append(Order(product, ask_price, buy_volume))
+                for ask_price, ask_volume in book.asks_below(fair_value):
+                    buy_volume = min(-ask_volume, self.order_size)  # Limit order size
+                    print(f"[{product}] BUY {buy_volume} @ {ask_price}")
+                    orders.append(Order(product, ask_price, buy_volume))
 
                 # Handle sell orders
-                for bid_price, bid_volume in sorted(order_depth.buy_orders.items(), reverse=True):
-                    if bid_price > fair_value:
-                        sell_volume = min(bid_volume, 20)  # Limit order size
-                        print(f"[{product}] SELL {sell_volume} @ {bid_price}")
-                        orders.append(Order(product, bid_price, -sell_volume))
+                for bid_price, bid_volume in book.bids_above(fair_value):
+                    sell_volume = min(bid_volume, self.order_size)  # Limit order size
+                    print(f"[{product}] SELL {sell_volume} @ {bid_price}")
+                    orders.append(Order(product, bid_price, -sell_volume))
 
             # Store the orders for each product
             result[product] = orders
 
         # Save price history for next round
-        serialized_data = json.dumps({
-            k: v for k, v in self.price_history.items()
-        })
+        with self.profiler.phase("encode"):
+            serialized_data = self.price_history.serialize()
 
-        logger.flush(state, result, conversions, trader_data)
+        with self.profiler.phase("flush"):
+            logger.flush(state, result, conversions, trader_data)
         return result, conversions, trader_data
@@ -0,0 +1,94 @@
+from itertools import accumulate
+from typing import Iterator, List, Optional, Tuple
+
+from datamodel import OrderDepth
+
+
+class OrderBook:
+    """Price-sorted view of an OrderDepth, built once per tick.
+
+    bids/asks hold (price, volume) pairs exactly as they appear in OrderDepth.buy_orders /
+    sell_orders (so ask volumes stay negative), best first. The OrderDepth itself is left untouched.
+    """
+
+    def __init__(self, order_depth: OrderDepth) -> None:
+        self.order_depth = order_depth
+        self.bids: List[Tuple[int, int]] = sorted(order_depth.buy_orders.items(), reverse=True)
+        self.asks: List[Tuple[int, int]] = sorted(order_depth.sell_orders.items())
+        self._bid_depth: Optional[List[int]] = None
+        self._ask_depth: Optional[List[int]] = None
+
+    @property
+    def best_bid(self) -> Optional[int]:
+        return self.bids[0][0] if self.bids else None
+
+    @property
+    def best_ask(self) -> Optional[int]:
+        return self.asks[0][0] if self.asks else None
+
+    @property
+    def best_bid_volume(self) -> int:
+        return self.bids[0][1] if self.bids else 0
+
+    @property
+    def best_ask_volume(self) -> int:
+        return -self.asks[0][1] if self.asks else 0
+
+    @property
+    def two_sided(self) -> bool:
+        return bool(self.bids) and bool(self.asks)
+
+    @property
+    def spread(self) -> Optional[int]:
+        return self.asks[0][0] - self.bids[0][0] if self.two_sided else None
+
+    @property
+    def mid(self) -> Optional[float]:
+        return (self.bids[0][0] + self.asks[0][0]) / 2 if self.two_sided else None
+
+    @property
+    def microprice(self) -> Optional[float]:
+        """Top-of-book price weighted towards the side with less volume (where the price is likely to move)."""
+        if not self.two_sided:
+            return None
+
+        bid_price, bid_volume = self.bids[0]
+        ask_price, ask_volume = self.asks[0][0], -self.asks[0][1]
+        total = bid_volume + ask_volume
+        if total <= 0:
+            return (bid_price + ask_price) / 2
+        return (bid_price * ask_volume + ask_price * bid_volume) / total
+
+    @property
+    def bid_depth(self) -> List[int]:
+        """Cumulative bid volume through each level, best first."""
+        if self._bid_depth is None:
+            self._bid_depth = list(accumulate(volume for _, volume in self.bids))
+        return self._bid_depth
+
+    @property
+    def ask_depth(self) -> List[int]:
+        """Cumulative ask volume (as a positive number) through each level, best first."""
+        if self._ask_depth is None:
+            self._ask_depth = list(accumulate(-volume for _, volume in self.asks))
+        return self._ask_depth
+
+    def iter_bids(self) -> Iterator[Tuple[int, int]]:
+        return iter(self.bids)
+
+    def iter_asks(self) -> Iterator[Tuple[int, int]]:
+        return iter(self.asks)
+
+    def asks_below(self, price: float) -> Iterator[Tuple[int, int]]:
+        """Ask levels priced strictly below price, cheapest first."""
+        for level in self.asks:
+            if level[0] >= price:
+                break
+            yield level
+
+    def bids_above(self, price: float) -> Iterator[Tuple[int, int]]:
+        """Bid levels priced strictly above price, highest first."""
+        for level in self.bids:
+            if level[0] <= price:
+                break
+            yield level
@@ -0,0 +1,71 @@
+from typing import Dict, List, Optional
+
+from datamodel import Order, Symbol
+
+# Per-product position limits the exchange enforces
+POSITION_LIMITS: Dict[Symbol, int] = {
+    "RAINFOREST_RESIN": 50,
+    "KELP": 50,
+    "SQUID_INK": 50,
+    "CROISSANTS": 250,
+    "JAMS": 350,
+    "DJEMBES": 60,
+    "PICNIC_BASKET1": 60,
+    "PICNIC_BASKET2": 100,
+    "VOLCANIC_ROCK": 400,
+    "VOLCANIC_ROCK_VOUCHER_9500": 200,
+    "VOLCANIC_ROCK_VOUCHER_9750": 200,
+    "VOLCANIC_ROCK_VOUCHER_10000": 200,
+    "VOLCANIC_ROCK_VOUCHER_10250": 200,
+    "VOLCANIC_ROCK_VOUCHER_10500": 200,
+}
+DEFAULT_POSITION_LIMIT = 50
+
+
+def coalesce_orders(orders: Dict[Symbol, List[Order]], position: Dict[Symbol, int],
+                    limits: Optional[Dict[Symbol, int]] = None) -> Dict[Symbol, List[Order]]:
+    """Merge each product's orders per price and clip them to what the position limit allows.
+
+    The exchange rejects every order for a product if its buys (or sells) could together take the
+    position past the limit, so the total bought and sold is cut down to the room left: buys from
+    the highest price down, sells from the lowest price up, which keeps the most aggressive levels.
+    The result has at most one order per (symbol, price), buys before sells.
+    """
+    limits = POSITION_LIMITS if limits is None else limits
+    result: Dict[Symbol, List[Order]] = {}
+    for symbol, product_orders in orders.items():
+        if not product_orders:
+            result[symbol] = []
+            continue
+
+        buys: Dict[int, int] = {}
+        sells: Dict[int, int] = {}
+        for order in product_orders:
+            if order.quantity > 0:
+                buys[order.price] = buys.get(order.price, 0) + order.quantity
+            elif order.quantity < 0:
+                sells[order.price] = sells.get(order.price, 0) - order.quantity
+
+        limit = limits.get(symbol, DEFAULT_POSITION_LIMIT)
+        current = position.get(symbol, 0)
+        merged: List[Order] = []
+
+        room = limit - current
+        for price in sorted(buys, reverse=True):
+            if room <= 0:
+                break
+            quantity = min(buys[price], room)
+            merged.append(Order(symbol, price, quantity))
+            room -= quantity
+
+        room = limit + current
+        for price in sorted(sells):
+            if room <= 0:
+                break
+            quantity = min(sells[price], room)
+            merged.append(Order(symbol, price, -quantity))
+            room -= quantity
+
+        result[symbol] = merged
+
+    return result
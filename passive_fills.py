@@ -0,0 +1,125 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from datamodel import OrderDepth, Symbol, Trade
+
+SUBMISSION = "SUBMISSION"
+
+
+class LevelQueue:
+    """Our resting orders on one side of one product, as parallel arrays in priority order.
+
+    ahead[i] is the estimated volume queued in front of order i at its price: the visible book
+    volume at that level when the order was placed, minus what prints at that price have eaten since.
+    """
+
+    __slots__ = ("buy", "prices", "remaining", "ahead")
+
+    def __init__(self, buy: bool, prices: np.ndarray, remaining: np.ndarray, ahead: np.ndarray) -> None:
+        self.buy = buy
+        self.prices = prices
+        self.remaining = remaining
+        self.ahead = ahead
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def fill(self, price: int, quantity: int) -> Tuple[np.ndarray, int]:
+        """Consume a print of `quantity` at `price`: returns our fill per order and the quantity left over.
+
+        Orders priced better than the print fill first, in price order. At the print's own price the
+        queue ahead of us is worked off before our order.
+        """
+        eligible = int(np.count_nonzero(self.prices >= price if self.buy else self.prices <= price))
+        if not eligible:
+            return np.zeros(len(self), dtype=np.int64), quantity
+
+        # Every order is two segments in time priority: volume ahead of it (only at the print's price), then ours
+        prices = self.prices[:eligible]
+        ahead = np.where(prices == price, self.ahead[:eligible], 0)
+        sizes = np.stack((ahead, self.remaining[:eligible]), axis=1).ravel()
+        starts = np.cumsum(sizes) - sizes
+        taken = np.clip(quantity - starts, 0, sizes)
+
+        self.ahead[:eligible] -= taken[0::2]
+        ours = np.zeros(len(self), dtype=np.int64)
+        ours[:eligible] = taken[1::2]
+        self.remaining -= ours
+        return ours, quantity - int(taken.sum())
+
+
+class PassiveFills:
+    """Fills the part of our orders that didn't take visible liquidity against market trade prints.
+
+    An order that doesn't cross rests at its price behind the volume the book already shows there
+    (bid_volume_n / ask_volume_n); prints at that price work off the queue ahead before reaching us,
+    prints through our price fill us outright. Like the exchange, resting orders live for one tick.
+    With keep_queue, an order re-sent at the same price keeps its place, with the queue ahead shrunk
+    to the level's current visible volume if that is smaller (cancellations ahead of us), which
+    approximates a quoting strategy that amends rather than re-queues.
+    """
+
+    def __init__(self, keep_queue: bool = False) -> None:
+        self.keep_queue = keep_queue
+        self.queues: Dict[Symbol, Tuple[LevelQueue, LevelQueue]] = {}
+        self.filled_volume = 0
+        self.filled_orders = 0
+
+    def _queue(self, buy: bool, orders: List[Tuple[int, int]], visible: Dict[int, int],
+               previous: Optional[LevelQueue]) -> LevelQueue:
+        # One entry per price, best price first: highest bids, lowest asks
+        levels: Dict[int, int] = {}
+        for price, quantity in orders:
+            levels[price] = levels.get(price, 0) + quantity
+        prices = np.array(sorted(levels, reverse=buy), dtype=np.int64)
+        remaining = np.array([levels[price] for price in prices.tolist()], dtype=np.int64)
+        ahead = np.array([abs(visible.get(price, 0)) for price in prices.tolist()], dtype=np.int64)
+
+        if previous is not None and len(previous) and len(prices):
+            # Keep the earlier (smaller) queue estimate at prices we were already resting at
+            index = np.searchsorted(-previous.prices if buy else previous.prices, -prices if buy else prices)
+            index = np.minimum(index, len(previous) - 1)
+            same = previous.prices[index] == prices
+            ahead[same] = np.minimum(ahead[same], previous.ahead[index[same]])
+
+        return LevelQueue(buy, prices, remaining, ahead)
+
+    def rest(self, product: Symbol, orders: List[Tuple[int, int]], order_depth: OrderDepth) -> None:
+        """Queue this tick's unfilled (price, signed quantity) remainders for `product`."""
+        previous = self.queues.get(product) if self.keep_queue else None
+        buys = [(price, quantity) for price, quantity in orders if quantity > 0]
+        sells = [(price, -quantity) for price, quantity in orders if quantity < 0]
+        self.queues[product] = (
+            self._queue(True, buys, order_depth.buy_orders, previous[0] if previous else None),
+            self._queue(False, sells, order_depth.sell_orders, previous[1] if previous else None),
+        )
+
+    def match(self, product: Symbol, trades: List[Trade], timestamp: int) -> List[Trade]:
+        """Fill our resting orders against this tick's prints in order, consuming the prints' quantity."""
+        queues = self.queues.get(product)
+        if queues is None:
+            return []
+
+        fills = []
+        for trade in trades:
+            if trade.quantity <= 0:
+                continue
+            for queue in queues:
+                if not len(queue) or not trade.quantity:
+                    continue
+                ours, trade.quantity = queue.fill(trade.price, trade.quantity)
+                for price, volume in zip(queue.prices[ours > 0].tolist(), ours[ours > 0].tolist()):
+                    if queue.buy:
+                        fills.append(Trade(product, price, volume, SUBMISSION, trade.seller, timestamp))
+                    else:
+                        fills.append(Trade(product, price, volume, trade.buyer, SUBMISSION, timestamp))
+                    self.filled_volume += volume
+                    self.filled_orders += 1
+
+        return fills
+
+    def cancel_missing(self, products: List[Symbol]) -> None:
+        """Drop the queues of products we sent no orders for this tick."""
+        for product in [product for product in self.queues if product not in products]:
+            del self.queues[product]
@@ -0,0 +1,128 @@
+import argparse
+import contextlib
+import os
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import log_reader
+from backtester import load_trader
+from datamodel import TradingState
+from latency import StreamingQuantiles
+
+OrderKey = Tuple[str, int, int]
+
+
+class RecordedTick(NamedTuple):
+    state: TradingState
+    orders: List[OrderKey]
+    trader_data: str
+
+
+class TickDiff(NamedTuple):
+    timestamp: int
+    missing: List[OrderKey]
+    extra: List[OrderKey]
+
+
+class ReplayReport:
+    def __init__(self) -> None:
+        self.ticks = 0
+        self.identical = 0
+        self.diffs: List[TickDiff] = []
+        self.latency = StreamingQuantiles()
+        self.elapsed = 0.0
+
+    @property
+    def matches(self) -> bool:
+        return self.ticks > 0 and not self.diffs
+
+
+def recorded_ticks(path: str) -> Iterator[RecordedTick]:
+    """Stream (state, orders sent, traderData returned) for every lambdaLog with a Logger.flush payload."""
+    for section, record in log_reader.iter_log(path):
+        if section != log_reader.SANDBOX or not record.lambda_log:
+            continue
+        payload = log_reader.decode_lambda_log(record.lambda_log)
+        if payload is None:
+            continue
+        orders = [(symbol, int(price), int(quantity)) for symbol, price, quantity in payload[1]]
+        yield RecordedTick(log_reader.decode_state(payload[0]), orders, payload[3])
+
+
+def order_keys(orders: Dict[str, List[Any]]) -> List[OrderKey]:
+    return [(order.symbol, int(order.price), int(order.quantity)) for product_orders in orders.values() for order in product_orders]
+
+
+def diff_orders(timestamp: int, recorded: List[OrderKey], emitted: List[OrderKey]) -> Optional[TickDiff]:
+    """Orders compared as multisets: the same orders in a different sequence still count as identical."""
+    if recorded == emitted:
+        return None
+    expected, actual = Counter(recorded), Counter(emitted)
+    if expected == actual:
+        return None
+    return TickDiff(timestamp, sorted((expected - actual).elements()), sorted((actual - expected).elements()))
+
+
+def replay(trader: Any, path: str, thread_trader_data: bool = True) -> ReplayReport:
+    """Feed every recorded state to `trader` and diff the orders it emits against the recorded ones.
+
+    With thread_trader_data (the default) each state carries the traderData the candidate returned
+    on the previous tick, as it would live; otherwise the logged value is used, which Logger may
+    have truncated.
+    """
+    report = ReplayReport()
+    trader_data = ""
+    start = time.perf_counter()
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for tick in recorded_ticks(path):
+            state = tick.state
+            if thread_trader_data:
+                state.traderData = trader_data
+
+            run_start = time.perf_counter()
+            orders, _, trader_data = trader.run(state)
+            report.latency.add(time.perf_counter() - run_start)
+
+            report.ticks += 1
+            diff = diff_orders(state.timestamp, tick.orders, order_keys(orders))
+            if diff is None:
+                report.identical += 1
+            else:
+                report.diffs.append(diff)
+
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay submission logs through a Trader and diff its orders.")
+    parser.add_argument("trader", help="candidate strategy file, e.g. r3_with_viz.py")
+    parser.add_argument("logs", nargs="+", help="submission logs whose lambdaLogs hold Logger.flush payloads")
+    parser.add_argument("--logged-trader-data", action="store_true",
+                        help="use the traderData recorded in the log instead of the candidate's own")
+    parser.add_argument("--show", type=int, default=10, help="differing ticks to print per log")
+    args = parser.parse_args()
+
+    failed = False
+    for path in args.logs:
+        report = replay(load_trader(args.trader), path, thread_trader_data=not args.logged_trader_data)
+        if not report.ticks:
+            print(f"{path}: no Logger.flush payloads to replay")
+            continue
+
+        latency = report.latency
+        print(f"{path}: {report.identical}/{report.ticks} ticks identical, replayed in {report.elapsed:.2f}s; "
+              f"run() p50 {latency.quantile(0.5) * 1e6:.0f}us p99 {latency.quantile(0.99) * 1e6:.0f}us "
+              f"max {latency.max * 1e6:.0f}us")
+        for diff in report.diffs[:args.show]:
+            print(f"  t={diff.timestamp}: missing {diff.missing} extra {diff.extra}")
+        failed = failed or bool(report.diffs)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
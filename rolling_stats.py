@@ -0,0 +1,196 @@
+import json
+import math
+from collections import deque
+from typing import Dict, Iterator, List, Optional
+
+import trader_codec
+
+# Window size from which the packed codec beats JSON per tick (python trader_codec.py): below it
+# packing is slower to encode and decode, from it encode is clearly faster and decode on par
+PACKED_MIN_WINDOW = 200
+
+
+class RollingWindow:
+    """Fixed-size window of prices with running sum, sum of squares and EMA, all updated in O(1)."""
+
+    def __init__(self, size: int, ema_alpha: Optional[float] = None) -> None:
+        self.size = size
+        self.ema_alpha = 2 / (size + 1) if ema_alpha is None else ema_alpha
+        self.values: deque = deque(maxlen=size)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.ema: Optional[float] = None
+
+    def update(self, value: float) -> None:
+        if len(self.values) == self.size:
+            oldest = self.values[0]
+            self.total -= oldest
+            self.total_sq -= oldest * oldest
+
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+        self.ema = value if self.ema is None else self.ema + self.ema_alpha * (value - self.ema)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self.values)
+
+    @property
+    def mean(self) -> float:
+        return self.total / len(self.values)
+
+    @property
+    def variance(self) -> float:
+        n = len(self.values)
+        mean = self.total / n
+        # Running sums can leave a tiny negative residue when the window is flat
+        return max(self.total_sq / n - mean * mean, 0.0)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def zscore(self, value: float) -> float:
+        std = self.std
+        return (value - self.mean) / std if std > 0 else 0.0
+
+    def to_state(self) -> Dict:
+        return {"v": list(self.values), "e": self.ema}
+
+    def to_bytes(self, scale: int = trader_codec.DEFAULT_SCALE) -> bytes:
+        return trader_codec.encode_series(list(self.values), self.ema, scale)
+
+    @classmethod
+    def from_bytes(cls, payload: bytes, size: int, ema_alpha: Optional[float] = None,
+                   scale: int = trader_codec.DEFAULT_SCALE) -> "RollingWindow":
+        values, ema = trader_codec.decode_series(payload, scale)
+        return cls.from_state({"v": values, "e": ema}, size, ema_alpha)
+
+    @classmethod
+    def from_state(cls, state, size: int, ema_alpha: Optional[float] = None) -> "RollingWindow":
+        window = cls(size, ema_alpha)
+        # Older traderData stored a bare list of prices per product
+        values = (state if isinstance(state, list) else state.get("v", []))[-size:]
+        window.values.extend(values)
+        window.total = float(sum(values))
+        window.total_sq = float(sum(value * value for value in values))
+
+        ema = state.get("e") if isinstance(state, dict) else None
+        if ema is None and values:
+            ema = values[0]
+            for value in values[1:]:
+                ema += window.ema_alpha * (value - ema)
+        window.ema = ema
+
+        return window
+
+
+class RollingStats:
+    """One RollingWindow per product, serializable to and from traderData.
+
+    restore() skips the rebuild when traderData is exactly what this instance produced last
+    tick, so a warm Trader instance pays O(1) per update instead of re-reading every window.
+    Packed traderData (see trader_codec) is decoded lazily, one product at a time on first use.
+    `sizes` overrides the window size for particular keys (e.g. a longer window for a spread).
+    serialize() writes packed traderData when `use_packed` is set, by default when some window
+    reaches PACKED_MIN_WINDOW, and JSON otherwise.
+    """
+
+    def __init__(self, size: int, ema_alpha: Optional[float] = None, sizes: Optional[Dict[str, int]] = None,
+                 use_packed: Optional[bool] = None) -> None:
+        self.size = size
+        self.sizes = {} if sizes is None else dict(sizes)
+        self.ema_alpha = ema_alpha
+        self.use_packed = use_packed
+        self.windows: Dict[str, RollingWindow] = {}
+        self.packed: Optional[trader_codec.PackedState] = None
+        self.last_text: Optional[str] = None
+
+    def size_of(self, product: str) -> int:
+        return self.sizes.get(product, self.size)
+
+    def _window(self, product: str) -> Optional[RollingWindow]:
+        window = self.windows.get(product)
+        if window is None and self.packed is not None and product in self.packed:
+            window = RollingWindow.from_bytes(self.packed.raw(product), self.size_of(product), self.ema_alpha,
+                                              self.packed.scale)
+            self.windows[product] = window
+
+        return window
+
+    def update(self, product: str, value: float) -> RollingWindow:
+        window = self._window(product)
+        if window is None:
+            window = self.windows[product] = RollingWindow(self.size_of(product), self.ema_alpha)
+
+        window.update(value)
+        return window
+
+    def get(self, product: str) -> Optional[RollingWindow]:
+        return self._window(product)
+
+    def __contains__(self, product: str) -> bool:
+        return product in self.windows or (self.packed is not None and product in self.packed)
+
+    def products(self) -> List[str]:
+        products = list(self.windows.keys())
+        if self.packed is not None:
+            products.extend(product for product in self.packed if product not in self.windows)
+
+        return products
+
+    def _materialize(self) -> None:
+        for product in self.products():
+            self._window(product)
+        self.packed = None
+
+    def to_json(self) -> str:
+        self._materialize()
+        self.last_text = json.dumps({product: window.to_state() for product, window in self.windows.items()},
+                                    separators=(",", ":"))
+        return self.last_text
+
+    def encode(self, scale: int = trader_codec.DEFAULT_SCALE) -> str:
+        """Pack into the compact traderData format; products never touched since restore() are copied as raw bytes."""
+        payloads = {}
+        for product in self.products():
+            if product in self.windows:
+                payloads[product] = self.windows[product].to_bytes(scale)
+            elif self.packed.scale == scale:
+                payloads[product] = self.packed.raw(product)
+            else:
+                payloads[product] = self._window(product).to_bytes(scale)
+
+        self.last_text = trader_codec.pack(payloads, scale)
+        return self.last_text
+
+    def serialize(self) -> str:
+        use_packed = self.use_packed
+        if use_packed is None:
+            use_packed = max(self.size, *self.sizes.values(), 0) >= PACKED_MIN_WINDOW
+        return self.encode() if use_packed else self.to_json()
+
+    def restore(self, text: str) -> None:
+        if text == self.last_text:
+            return
+
+        if trader_codec.is_packed(text):
+            self.windows = {}
+            self.packed = trader_codec.PackedState(text)
+        else:
+            self.windows = {
+                product: RollingWindow.from_state(state, self.size_of(product), self.ema_alpha)
+                for product, state in json.loads(text).items()
+            }
+            self.packed = None
+        self.last_text = text
+
+    @classmethod
+    def from_json(cls, text: str, size: int, ema_alpha: Optional[float] = None,
+                  sizes: Optional[Dict[str, int]] = None, use_packed: Optional[bool] = None) -> "RollingStats":
+        stats = cls(size, ema_alpha, sizes, use_packed)
+        stats.restore(text)
+        return stats
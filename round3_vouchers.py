@@ -1,13 +1,56 @@
 from datamodel import OrderDepth, TradingState, Order
-from typing import List, Dict
-import json
+from typing import Dict, List, Optional
+from baskets import BasketEngine
+from latency import Profiler, timed
+from order_book import OrderBook
+from order_coalescing import coalesce_orders
+from option_pricing import DAYS_TO_EXPIRY, UNDERLYING, VoucherPricer
+from rolling_stats import RollingStats
 
 
 class Trader:
-    def __init__(self):
-        self.price_history: Dict[str, List[float]] = {}
-        self.max_history_length = 7  # Use last 7 mid-prices for averaging
+    def __init__(self, max_history_length: int = 7, aggressive_edge: float = 0.2, aggressive_size: int = 50,
+                 conservative_edge: float = 0.01, conservative_size: int = 20, voucher_gap: float = 10,
+                 voucher_size: int = 20, voucher_model: str = "black_scholes",
+                 days_to_expiry: float = DAYS_TO_EXPIRY, smile_prior: Optional[List[float]] = None,
+                 basket_trading: bool = False, basket_entry_z: float = 2.0, basket_size: int = 5, coalesce: bool = True,
+                 profile: bool = False):
+        self.price_history = RollingStats(max_history_length)
+        # Opt-in per-phase timings (latency.py); a summary is printed every 1000 ticks
+        self.profiler = Profiler(enabled=profile)
+        self.max_history_length = max_history_length  # Use last 7 mid-prices for averaging
+        self.aggressive_edge = aggressive_edge
+        self.aggressive_size = aggressive_size
+        self.conservative_edge = conservative_edge
+        self.conservative_size = conservative_size
+        # Merge the two layers' orders per price and clip them to the position limits before sending
+        self.coalesce = coalesce
+        self.voucher_gap = voucher_gap
+        self.voucher_size = voucher_size
+        # "black_scholes" values vouchers with time value, "intrinsic" as max(rock - strike, 0)
+        self.voucher_model = voucher_model
+        # smile_prior: coefficients from smile_fit.py (option_pricing.load_smile), None prices at one flat vol
+        self.voucher_pricer = VoucherPricer(days_to_expiry=days_to_expiry, smile=smile_prior)
+        # PICNIC_BASKET1/2 against their constituents; the spread windows are saved with price_history
+        self.basket_trading = basket_trading
+        self.baskets = BasketEngine(stats=self.price_history, entry_z=basket_entry_z, lean_size=basket_size)
+
+    def voucher_values(self, state: TradingState) -> Dict[str, float]:
+        rock_prices = self.price_history.get(UNDERLYING)
+        if not rock_prices:
+            return {}
+        rock_avg = rock_prices.mean
+
+        mids = {}
+        for product, order_depth in state.order_depths.items():
+            if self.voucher_pricer.strike_of(product) is not None and order_depth.buy_orders and order_depth.sell_orders:
+                mids[product] = (max(order_depth.buy_orders) + min(order_depth.sell_orders)) / 2
+
+        if self.voucher_model == "intrinsic":
+            return {product: max(rock_avg - self.voucher_pricer.strikes[product], 0) for product in mids}
+        return self.voucher_pricer.fair_values(rock_avg, mids, state.timestamp)
 
+    @timed("run")
     def run(self, state: TradingState):
         result = {}
         conversions = 1
@@ -16,63 +59,58 @@ class Trader:
         tradable_prefix = "VOLCANIC_ROCK_VOUCHER"
 
         # Restore saved price history
-        if state.traderData:
-            try:
-                loaded_data = json.loads(state.traderData)
-                self.price_history = {
-                    k: v[-self.max_history_length:] for k, v in loaded_data.items()
-                }
-            except Exception as e:
-                print("Failed to load traderData:", e)
-
-        for product, order_depth in state.order_depths.items():
+        with self.profiler.phase("restore"):
+            if state.traderData:
+                try:
+                    self.price_history.restore(state.traderData)
+                except Exception as e:
+                    print("Failed to load traderData:", e)
+
+        # The underlying isn't traded, but its average is what the vouchers are priced from
+        if UNDERLYING in state.order_depths:
+            rock_book = OrderBook(state.order_depths[UNDERLYING])
+            if rock_book.two_sided:
+                self.price_history.update(UNDERLYING, rock_book.mid)
+        voucher_values = None
+
+        for product, order_depth in self.profiler.products("product", state.order_depths.items()):
             if product not in tradable_products and not product.startswith(tradable_prefix):
                 continue  # Ignore unpredictable products
 
             orders: List[Order] = []
 
-            best_bid = max(order_depth.buy_orders.keys()) if order_depth.buy_orders else None
-            best_ask = min(order_depth.sell_orders.keys()) if order_depth.sell_orders else None
-
-            if best_bid is not None and best_ask is not None:
-                mid_price = (best_bid + best_ask) / 2
-
-                if product not in self.price_history:
-                    self.price_history[product] = []
+            book = OrderBook(order_depth)
 
-                self.price_history[product].append(mid_price)
-                if len(self.price_history[product]) > self.max_history_length:
-                    self.price_history[product].pop(0)
+            if book.two_sided:
+                mid_price = book.mid
 
-                fair_value = sum(self.price_history[product]) / len(self.price_history[product])
+                fair_value = self.price_history.update(product, mid_price).mean
 
                 # Special logic for VOLCANIC_ROCK_VOUCHER_x
                 if product.startswith(tradable_prefix):
                     try:
-                        strike = int(product.split("_")[-1])
-                        rock_prices = self.price_history.get("VOLCANIC_ROCK", [])
+                        # Every voucher is valued in one vectorized call, on the first one seen this tick
+                        if voucher_values is None:
+                            with self.profiler.phase("voucher_pricing"):
+                                voucher_values = self.voucher_values(state)
+                        voucher_value = voucher_values.get(product)
 
-                        if rock_prices:
-                            rock_avg = sum(rock_prices) / len(rock_prices)
-                            intrinsic_value = max(rock_avg - strike, 0)
-
-                            voucher_mid = (best_bid + best_ask) / 2
+                        if voucher_value is not None:
+                            voucher_mid = mid_price
 
                             # Buy undervalued vouchers
-                            if voucher_mid < intrinsic_value - 10:
-                                for ask_price, ask_volume in sorted(order_depth.sell_orders.items()):
-                                    if ask_price < intrinsic_value - 10:
-                                        buy_volume = min(-ask_volume, 20)
-                                        print(f"[{product}] BUY undervalued VOUCHER {buy_volume} @ {ask_price}")
-                                        orders.append(Order(product, ask_price, buy_volume))
+                            if voucher_mid < voucher_value - self.voucher_gap:
+                                for ask_price, ask_volume in book.asks_below(voucher_value - self.voucher_gap):
+                                    buy_volume = min(-ask_volume, self.voucher_size)
+                                    print(f"[{product}] BUY undervalued VOUCHER {buy_volume} @ {ask_price}")
+                                    orders.append(Order(product, ask_price, buy_volume))
 
                             # Sell overvalued vouchers
-                            if voucher_mid > intrinsic_value + 10:
-                                for bid_price, bid_volume in sorted(order_depth.buy_orders.items(), reverse=True):
-                                    if bid_price > intrinsic_value + 10:
-                                        sell_volume = min(bid_volume, 20)
-                                        print(f"[{product}] SELL overvalued VOUCHER {sell_volume} @ {bid_price}")
-                                        orders.append(Order(product, bid_price, -sell_volume))
+                            if voucher_mid > voucher_value + self.voucher_gap:
+                                for bid_price, bid_volume in book.bids_above(voucher_value + self.voucher_gap):
+                                    sell_volume = min(bid_volume, self.voucher_size)
+                                    print(f"[{product}] SELL overvalued VOUCHER {sell_volume} @ {bid_price}")
+                                    orders.append(Order(product, bid_price, -sell_volume))
                     except Exception as e:
                         print(f"Failed to process {product} as voucher:", e)
 
@@ -80,36 +118,39 @@ class Trader:
                     continue  # Skip general logic for vouchers
 
                 # General trading logic for KELP and RESIN
-                for ask_price, ask_volume in sorted(order_depth.sell_orders.items()):
-                    if ask_price < fair_value - 0.2:
-                        buy_volume = min(-ask_volume, 50)
-                        print(f"[{product}] BUY {buy_volume} @ {ask_price}")
-                        orders.append(Order(product, ask_price, buy_volume))
-
-                for bid_price, bid_volume in sorted(order_depth.buy_orders.items(), reverse=True):
-                    if bid_price > fair_value + 0.2:
-                        sell_volume = min(bid_volume, 50)
-                        print(f"[{product}] SELL {sell_volume} @ {bid_price}")
-                        orders.append(Order(product, bid_price, -sell_volume))
+                for ask_price, ask_volume in book.asks_below(fair_value - self.aggressive_edge):
+                    buy_volume = min(-ask_volume, self.aggressive_size)
+                    print(f"[{product}] BUY {buy_volume} @ {ask_price}")
+                    orders.append(Order(product, ask_price, buy_volume))
+
+                for bid_price, bid_volume in book.bids_above(fair_value + self.aggressive_edge):
+                    sell_volume = min(bid_volume, self.aggressive_size)
+                    print(f"[{product}] SELL {sell_volume} @ {bid_price}")
+                    orders.append(Order(product, bid_price, -sell_volume))
 
                 # Conservative layer
-                for ask_price, ask_volume in sorted(order_depth.sell_orders.items()):
-                    if ask_price < fair_value - 0.01:
-                        buy_volume = min(-ask_volume, 20)
-                        print(f"[{product}] BUY {buy_volume} @ {ask_price}")
-                        orders.append(Order(product, ask_price, buy_volume))
-
-                for bid_price, bid_volume in sorted(order_depth.buy_orders.items(), reverse=True):
-                    if bid_price > fair_value + 0.01:
-                        sell_volume = min(bid_volume, 20)
-                        print(f"[{product}] SELL {sell_volume} @ {bid_price}")
-                        orders.append(Order(product, bid_price, -sell_volume))
+                for ask_price, ask_volume in book.asks_below(fair_value - self.conservative_edge):
+                    buy_volume = min(-ask_volume, self.conservative_size)
+                    print(f"[{product}] BUY {buy_volume} @ {ask_price}")
+                    orders.append(Order(product, ask_price, buy_volume))
+
+                for bid_price, bid_volume in book.bids_above(fair_value + self.conservative_edge):
+                    sell_volume = min(bid_volume, self.conservative_size)
+                    print(f"[{product}] SELL {sell_volume} @ {bid_price}")
+                    orders.append(Order(product, bid_price, -sell_volume))
 
             result[product] = orders
 
+        if self.basket_trading:
+            with self.profiler.phase("baskets"):
+                result.update(self.baskets.orders(state.order_depths, state.position))
+
+        if self.coalesce:
+            with self.profiler.phase("coalesce"):
+                result = coalesce_orders(result, state.position)
+
         # Save price history for next round
-        serialized_data = json.dumps({
-            k: v for k, v in self.price_history.items()
-        })
+        with self.profiler.phase("encode"):
+            serialized_data = self.price_history.serialize()
 
         return result, conversions, serialized_data
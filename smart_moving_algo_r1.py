@@ -1,82 +1,84 @@
 
 from datamodel import OrderDepth, TradingState, Order
-from typing import List, Dict
-import json
+from typing import List
+from latency import Profiler, timed
+from order_book import OrderBook
+from order_coalescing import coalesce_orders
+from rolling_stats import RollingStats
 
 
 class Trader:
-    def __init__(self):
-        self.price_history: Dict[str, List[float]] = {}
-        self.max_history_length = 7  # Use last 8 mid-prices for averaging
-
+    def __init__(self, max_history_length: int = 7, aggressive_edge: float = .2, aggressive_size: int = 50,
+                 conservative_edge: float = .01, conservative_size: int = 20, coalesce: bool = True,
+                 profile: bool = False):
+        self.price_history = RollingStats(max_history_length)
+        # Opt-in per-phase timings (latency.py); a summary is printed every 1000 ticks
+        self.profiler = Profiler(enabled=profile)
+        self.max_history_length = max_history_length  # Use last 8 mid-prices for averaging
+        self.aggressive_edge = aggressive_edge
+        self.aggressive_size = aggressive_size
+        self.conservative_edge = conservative_edge
+        self.conservative_size = conservative_size
+        # Merge the two layers' orders per price and clip them to the position limits before sending
+        self.coalesce = coalesce
+
+    @timed("run")
     def run(self, state: TradingState):
         result = {}
         conversions = 1
 
-        if state.traderData:
-            try:
-                loaded_data = json.loads(state.traderData)
-                self.price_history = {
-                    k: v[-self.max_history_length:] for k, v in loaded_data.items()
-                }
-            except Exception as e:
-                print("Failed to load traderData:", e)
+        with self.profiler.phase("restore"):
+            if state.traderData:
+                try:
+                    self.price_history.restore(state.traderData)
+                except Exception as e:
+                    print("Failed to load traderData:", e)
 
-        for product, order_depth in state.order_depths.items():
+        for product, order_depth in self.profiler.products("product", state.order_depths.items()):
             if product == "SQUID_INK":
                 continue
 
             orders: List[Order] = []
 
-            best_bid = max(order_depth.buy_orders.keys()) if order_depth.buy_orders else None
-            best_ask = min(order_depth.sell_orders.keys()) if order_depth.sell_orders else None
-
-            if best_bid is not None and best_ask is not None:
-                mid_price = (best_bid + best_ask) / 2
-
-                if product not in self.price_history:
-                    self.price_history[product] = []
+            book = OrderBook(order_depth)
 
-                # Add the new price and maintain history length manually
-                self.price_history[product].append(mid_price)
-                if len(self.price_history[product]) > self.max_history_length:
-                    self.price_history[product].pop(0)  # Remove the oldest price
+            if book.two_sided:
+                mid_price = book.mid
 
-                fair_value = sum(self.price_history[product]) / len(self.price_history[product])
+                fair_value = self.price_history.update(product, mid_price).mean
 
                 # Handle buy orders
-                for ask_price, ask_volume in sorted(order_depth.sell_orders.items()):
-                    if ask_price < fair_value - .2:
-                        buy_volume = min(-ask_volume, 50)
-                        print(f"[{product}] BUY {buy_volume} @ {ask_price}")
-                        orders.append(Order(product, ask_price, buy_volume))
+                for ask_price, ask_volume in book.asks_below(fair_value - self.aggressive_edge):
+                    buy_volume = min(-ask_volume, self.aggressive_size)
+                    print(f"[{product}] BUY {buy_volume} @ {ask_price}")
+                    orders.append(Order(product, ask_price, buy_volume))
 
                 # Handle sell orders
-                for bid_price, bid_volume in sorted(order_depth.buy_orders.items(), reverse=True):
-                    if bid_price > fair_value + .2:
-                        sell_volume = min(bid_volume, 50)
-                        print(f"[{product}] SELL {sell_volume} @ {bid_price}")
-                        orders.append(Order(product, bid_price, -sell_volume))
-
-                for ask_price, ask_volume in sorted(order_depth.sell_orders.items()):
-                    if ask_price < fair_value - .01:
-                        buy_volume = min(-ask_volume, 20)  # Limit order size
-                        print(f"[{product}] BUY {buy_volume} @ {ask_price}")
-                        orders.append(Order(product, ask_price, buy_volume))
+                for bid_price, bid_volume in book.bids_above(fair_value + self.aggressive_edge):
+                    sell_volume = min(bid_volume, self.aggressive_size)
+                    print(f"[{product}] SELL {sell_volume} @ {bid_price}")
+                    orders.append(Order(product, bid_price, -sell_volume))
+
+                for ask_price, ask_volume in book.asks_below(fair_value - self.conservative_edge):
+                    buy_volume = min(-ask_volume, self.conservative_size)  # Limit order size
+                    print(f"[{product}] BUY {buy_volume} @ {ask_price}")
+                    orders.append(Order(product, ask_price, buy_volume))
 
                 # Handle sell orders
-                for bid_price, bid_volume in sorted(order_depth.buy_orders.items(), reverse=True):
-                    if bid_price > fair_value + .01:
-                        sell_volume = min(bid_volume, 20)  # Limit order size
-                        print(f"[{product}] SELL {sell_volume} @ {bid_price}")
-                        orders.append(Order(product, bid_price, -sell_volume))
+                for bid_price, bid_volume in book.bids_above(fair_value + self.conservative_edge):
+                    sell_volume = min(bid_volume, self.conservative_size)  # Limit order size
+                    print(f"[{product}] SELL {sell_volume} @ {bid_price}")
+                    orders.append(Order(product, bid_price, -sell_volume))
 
             # Store the orders for each product
             result[product] = orders
 
+        if self.coalesce:
+            with self.profiler.phase("coalesce"):
+                result = coalesce_orders(result, state.position)
+
         # Save price history for next round
-        serialized_data = json.dumps({
-            k: v for k, v in self.price_history.items()
-        })
+        with self.profiler.phase("encode"):
+            serialized_data = self.price_history.serialize()
 
         return result, conversions, serialized_data
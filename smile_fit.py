@@ -0,0 +1,180 @@
+import argparse
+import glob
+import json
+import os
+import re
+import time
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+import tick_cache
+from option_pricing import DAYS_TO_EXPIRY, UNDERLYING, VoucherPricer, implied_vol, time_to_expiry
+
+DEFAULT_OUTPUT = os.path.join(tick_cache.CACHE_DIR, "smile_round_3")
+SMILE_DEGREE = 2
+
+
+class VoucherTrades(NamedTuple):
+    """Voucher trades as-of joined to the last underlying trade at or before them, one entry per trade."""
+    day: np.ndarray
+    timestamp: np.ndarray
+    strike: np.ndarray
+    price: np.ndarray
+    quantity: np.ndarray
+    spot: np.ndarray
+    tte: np.ndarray
+    log_moneyness: np.ndarray
+    iv: np.ndarray
+
+
+class SmileFit(NamedTuple):
+    """Per-bucket smiles: vol = polyval(coefficients[i], log(strike / spot)) for (day[i], bucket_start[i])."""
+    day: np.ndarray
+    bucket_start: np.ndarray
+    coefficients: np.ndarray
+    trades: np.ndarray
+    prior: np.ndarray
+
+
+def _day_of(path: str) -> int:
+    return int(re.search(r"day_(-?\d+)", os.path.basename(path)).group(1))
+
+
+def join_day(path: str, day: int, days_to_expiry: float, pricer: VoucherPricer) -> Optional[List[np.ndarray]]:
+    """[day, timestamp, strike, price, quantity, spot, tte] columns for one day's voucher trades."""
+    table = tick_cache.load(path)
+    rock = table.product(UNDERLYING)
+    if not len(rock):
+        return None
+
+    # Rows within a product are in timestamp order, so the as-of join is one searchsorted per strike
+    rock_timestamps = np.asarray(rock["timestamp"])
+    rock_prices = np.asarray(rock["price"], dtype=np.float64)
+
+    parts = []
+    for product in table.products:
+        strike = pricer.strike_of(product)
+        if strike is None:
+            continue
+        trades = table.product(product)
+        timestamps = np.asarray(trades["timestamp"])
+        previous = np.searchsorted(rock_timestamps, timestamps, side="right") - 1
+        known = previous >= 0
+        parts.append((
+            timestamps[known],
+            np.full(int(known.sum()), strike, dtype=np.float64),
+            np.asarray(trades["price"], dtype=np.float64)[known],
+            np.asarray(trades["quantity"])[known],
+            rock_prices[previous[known]],
+        ))
+
+    if not parts:
+        return None
+
+    timestamp, strike, price, quantity, spot = (np.concatenate(column) for column in zip(*parts))
+    tte = time_to_expiry(timestamp, days_to_expiry - day)
+    return [np.full(len(timestamp), day), timestamp, strike, price, quantity, spot, tte]
+
+
+def load_trades(folder: str, days_to_expiry: float = DAYS_TO_EXPIRY) -> VoucherTrades:
+    """Join every day in `folder` and solve all the implied vols in one vectorized call.
+
+    days_to_expiry is the time left at the start of day 0; each later day has one day less.
+    """
+    pricer = VoucherPricer()
+    days = []
+    for path in sorted(glob.glob(os.path.join(folder, "trades_round_*_day_*.csv")), key=_day_of):
+        joined = join_day(path, _day_of(path), days_to_expiry, pricer)
+        if joined is not None:
+            days.append(joined)
+
+    if not days:
+        raise FileNotFoundError(f"no trade files with {UNDERLYING} and its vouchers in {folder}")
+
+    day, timestamp, strike, price, quantity, spot, tte = (np.concatenate(column) for column in zip(*days))
+    iv = implied_vol(price, spot, strike, tte)
+    return VoucherTrades(day, timestamp, strike, price, quantity, spot, tte, np.log(strike / spot), iv)
+
+
+def fit_smiles(trades: VoucherTrades, bucket: int, degree: int = SMILE_DEGREE) -> SmileFit:
+    """Least-squares smile per (day, time bucket), all buckets solved in one batched call.
+
+    Each bucket's normal equations are accumulated with bincount over the power sums of the
+    log-moneyness, so there is no Python loop over buckets. Buckets need more distinct strikes
+    than coefficients; trades whose vol can't be implied (below intrinsic, etc.) are skipped.
+    """
+    solved = ~np.isnan(trades.iv)
+    day = trades.day[solved]
+    start = trades.timestamp[solved] // bucket * bucket
+    m = trades.log_moneyness[solved]
+    iv = trades.iv[solved]
+    strike = trades.strike[solved]
+
+    keys, group = np.unique(np.stack((day, start)), axis=1, return_inverse=True)
+    group = group.ravel()
+    groups = keys.shape[1]
+    terms = degree + 1
+
+    powers = [np.bincount(group, weights=m ** p, minlength=groups) for p in range(2 * degree + 1)]
+    moments = [np.bincount(group, weights=iv * m ** p, minlength=groups) for p in range(terms)]
+
+    # Row i / column j of the normal equations pair coefficient of m^(degree-i) with m^(degree-j)
+    normal = np.empty((groups, terms, terms))
+    rhs = np.empty((groups, terms))
+    for i in range(terms):
+        rhs[:, i] = moments[degree - i]
+        for j in range(terms):
+            normal[:, i, j] = powers[2 * degree - i - j]
+
+    pairs = np.unique(np.stack((group, strike)), axis=1)
+    distinct_strikes = np.bincount(pairs[0].astype(np.int64), minlength=groups)
+    ok = distinct_strikes >= terms
+
+    coefficients = np.full((groups, terms), np.nan)
+    coefficients[ok] = np.linalg.solve(normal[ok], rhs[ok][:, :, None])[:, :, 0]
+
+    prior = np.polyfit(m, iv, degree) if len(m) > degree else np.full(terms, np.nan)
+    return SmileFit(keys[0][ok], keys[1][ok], coefficients[ok], np.bincount(group, minlength=groups)[ok], prior)
+
+
+def save(fit: SmileFit, output: str, bucket: int, days_to_expiry: float) -> None:
+    """Write the per-bucket table (<output>.npz) and the prior the Trader loads (<output>.json)."""
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    np.savez(output + ".npz", day=fit.day, bucket_start=fit.bucket_start, coefficients=fit.coefficients,
+             trades=fit.trades, prior=fit.prior)
+    with open(output + ".json", "w") as f:
+        json.dump({
+            "coefficients": fit.prior.tolist(),
+            "variable": "log(strike / spot)",
+            "bucket": bucket,
+            "days_to_expiry": days_to_expiry,
+            "buckets": len(fit.day),
+        }, f, indent=2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fit implied-vol smiles to the recorded voucher trades.")
+    parser.add_argument("--data", default="./data/round3/")
+    parser.add_argument("--bucket", type=int, default=10_000, help="timestamp width of each smile fit")
+    parser.add_argument("--days-to-expiry", type=float, default=DAYS_TO_EXPIRY, help="days left at the start of day 0")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT, help="output path without extension")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    trades = load_trades(args.data, args.days_to_expiry)
+    fit = fit_smiles(trades, args.bucket)
+    save(fit, args.out, args.bucket, args.days_to_expiry)
+    elapsed = time.perf_counter() - start
+
+    solved = ~np.isnan(trades.iv)
+    print(f"{len(trades.iv)} voucher trades, {int(solved.sum())} with an implied vol, "
+          f"{len(fit.day)} smiles fitted in {elapsed:.2f}s")
+    for strike in np.unique(trades.strike):
+        rows = solved & (trades.strike == strike)
+        print(f"  {int(strike):>6}: median IV {np.median(trades.iv[rows]):.4f} over {int(rows.sum())} trades")
+    print(f"prior (highest power first): {fit.prior.tolist()} -> {args.out}.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+
+import market_data
+import tick_cache
+import tick_stream
+from backtester import Backtester, day_files, load_trader
+
+# (trader_path, params, day, prices_path, trades_path)
+Task = Tuple[str, Dict[str, Any], int, str, str]
+
+
+def expand_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Turn {"knob": [v1, v2], ...} into one params dict per combination."""
+    names = list(grid.keys())
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+@lru_cache(maxsize=None)
+def _load_day(prices_path: str, trades_path: str):
+    # Each worker parses a day once and reuses it for every parameter set it is handed
+    return tick_cache.load_books(prices_path), tick_cache.load_market_trades(trades_path)
+
+
+def run_task(task: Task) -> Dict[str, Any]:
+    trader_path, params, day, prices_path, trades_path = task
+    if market_data.attached():
+        # Stream straight off the shared copy: no per-worker books, memory stays flat
+        stream = tick_stream.iter_snapshots([(day, prices_path, trades_path)], load=market_data.table)
+        result = Backtester(load_trader(trader_path, **params), stream=stream).run()
+    else:
+        books, trades = _load_day(prices_path, trades_path)
+        result = Backtester(load_trader(trader_path, **params), books, trades).run()
+
+    return {
+        **params,
+        "day": day,
+        "pnl": result.final_pnl,
+        "max_drawdown": result.max_drawdown,
+        "fills": result.fills,
+        "elapsed": result.elapsed,
+    }
+
+
+def sweep(trader_path: str,
+          grid: Dict[str, List[Any]],
+          days: List[Tuple[int, str, str]],
+          workers: int = None,
+          shared: bool = False) -> pd.DataFrame:
+    """Backtest every grid point on every day in a process pool, one (day, params) pair per task.
+
+    With `shared`, the days are loaded once into shared memory (market_data.py) and every worker
+    maps the same copy instead of building its own.
+    """
+    tasks: List[Task] = [
+        (trader_path, params, day, prices_path, trades_path)
+        for params in expand_grid(grid)
+        for day, prices_path, trades_path in days
+    ]
+    workers = workers or os.cpu_count() or 1
+
+    # Chunking amortizes pickling/IPC across thousands of small tasks; a few chunks per worker
+    # still balances uneven task durations
+    chunksize = max(1, len(tasks) // (workers * 4))
+    if shared:
+        with market_data.MarketDataServer(path for _, prices, trades in days for path in (prices, trades)) as server:
+            with ProcessPoolExecutor(max_workers=workers, initializer=market_data.attach,
+                                     initargs=(server.manifest,)) as executor:
+                rows = list(executor.map(run_task, tasks, chunksize=chunksize))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            rows = list(executor.map(run_task, tasks, chunksize=chunksize))
+
+    return pd.DataFrame(rows)
+
+
+def summarize(results: pd.DataFrame, grid: Dict[str, List[Any]]) -> pd.DataFrame:
+    """Aggregate per-day rows into one row per parameter set, best total PnL first."""
+    summary = results.groupby(list(grid.keys())).agg(
+        pnl=("pnl", "sum"),
+        worst_day_pnl=("pnl", "min"),
+        max_drawdown=("max_drawdown", "max"),
+        fills=("fills", "sum"),
+    )
+    return summary.sort_values("pnl", ascending=False).reset_index()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sweep Trader constructor parameters over recorded days.")
+    parser.add_argument("trader", help="strategy file, e.g. smart_moving_algo_r1.py")
+    parser.add_argument("--grid", required=True,
+                        help='JSON object of parameter lists, e.g. \'{"max_history_length": [5, 7, 9]}\'')
+    parser.add_argument("--data", default="./data/round1/")
+    parser.add_argument("--round", type=int, default=1)
+    parser.add_argument("--days", type=int, nargs="*", help="days to replay (default: all)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shared-memory", action="store_true",
+                        help="load the days once into shared memory instead of once per worker")
+    parser.add_argument("--out", default=None, help="write the per-day result table to this CSV")
+    args = parser.parse_args()
+
+    grid = json.loads(args.grid)
+    days = [d for d in day_files(args.data, args.round) if not args.days or d[0] in args.days]
+
+    results = sweep(args.trader, grid, days, workers=args.workers, shared=args.shared_memory)
+    if args.out:
+        results.to_csv(args.out, index=False)
+
+    print(summarize(results, grid).head(20).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+import argparse
+import glob
+import json
+import os
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from datamodel import Symbol, Trade
+
+CACHE_VERSION = 1
+CACHE_DIR = ".tick_cache"
+
+# Empty book levels / missing numbers are stored as this sentinel in the int32 columns
+MISSING = np.iinfo(np.int32).min
+
+# "row" is the line's position in the source CSV, kept so the original ordering can be restored
+PRICE_INT_COLUMNS = [
+    "row", "day", "timestamp", "product",
+    "bid_price_1", "bid_volume_1", "bid_price_2", "bid_volume_2", "bid_price_3", "bid_volume_3",
+    "ask_price_1", "ask_volume_1", "ask_price_2", "ask_volume_2", "ask_price_3", "ask_volume_3",
+]
+PRICE_FLOAT_COLUMNS = ["mid_price", "profit_and_loss"]
+TRADE_INT_COLUMNS = ["row", "timestamp", "symbol", "price", "quantity", "buyer", "seller", "currency"]
+
+# Columns holding codes into TickTable.strings rather than numbers
+STRING_COLUMNS = {"product", "symbol", "buyer", "seller", "currency"}
+
+
+class TickTable:
+    """Memory-mapped columnar view of one prices or trades CSV.
+
+    Rows are grouped by product/symbol (timestamp order within a group), so product() is a
+    zero-copy slice of every column.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], strings: List[str], key: str,
+                 ranges: Dict[Symbol, Tuple[int, int]]) -> None:
+        self.columns = columns
+        self.strings = strings
+        self.key = key
+        self.ranges = ranges
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def __len__(self) -> int:
+        return len(self.columns[self.key])
+
+    @property
+    def products(self) -> List[Symbol]:
+        return list(self.ranges.keys())
+
+    def product(self, name: Symbol) -> "TickTable":
+        start, stop = self.ranges.get(name, (0, 0))
+        columns = {column: values[start:stop] for column, values in self.columns.items()}
+        return TickTable(columns, self.strings, self.key, {name: (0, stop - start)} if stop > start else {})
+
+    def frame(self) -> pd.DataFrame:
+        """Copy into a DataFrame shaped like the source CSV (sentinels become NaN, codes become strings)."""
+        data = {}
+        lookup = np.array(self.strings, dtype=object)
+        for column, values in self.columns.items():
+            if column == "row":
+                continue
+            if column in STRING_COLUMNS:
+                data[column] = lookup[values]
+            elif values.dtype == np.int32:
+                data[column] = np.where(values == MISSING, np.nan, values) if (values == MISSING).any() else np.array(values)
+            else:
+                data[column] = np.array(values)
+
+        return pd.DataFrame(data)
+
+
+def _cache_paths(source: str) -> Tuple[str, str, str]:
+    folder, name = os.path.split(os.path.abspath(source))
+    stem = os.path.join(folder, CACHE_DIR, os.path.splitext(name)[0])
+    return stem + ".json", stem + ".i4.npy", stem + ".f8.npy"
+
+
+def _source_stamp(source: str) -> Dict[str, int]:
+    stat = os.stat(source)
+    return {"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+
+def _save(path: str, array: np.ndarray) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def build(source: str) -> None:
+    """Convert one prices_*/trades_* CSV into its cache files (int32 matrix, float64 matrix, JSON meta)."""
+    meta_path, int_path, float_path = _cache_paths(source)
+    os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+
+    df = pd.read_csv(source, sep=";")
+    is_prices = "product" in df.columns
+    key = "product" if is_prices else "symbol"
+    int_columns = PRICE_INT_COLUMNS if is_prices else TRADE_INT_COLUMNS
+    float_columns = PRICE_FLOAT_COLUMNS if is_prices else []
+
+    for column in STRING_COLUMNS.intersection(df.columns):
+        df[column] = df[column].fillna("").astype(str)
+
+    df["row"] = np.arange(len(df))
+
+    # Group rows by product so every per-product slice is contiguous; the sort is stable so
+    # timestamp order is kept within a product
+    df = df.sort_values(key, kind="stable").reset_index(drop=True)
+    strings = sorted(set().union(*(df[c] for c in STRING_COLUMNS.intersection(df.columns))))
+    codes = {s: i for i, s in enumerate(strings)}
+
+    ints = np.empty((len(int_columns), len(df)), dtype=np.int32)
+    for i, column in enumerate(int_columns):
+        if column in STRING_COLUMNS:
+            ints[i] = df[column].map(codes).to_numpy()
+        else:
+            ints[i] = df[column].fillna(MISSING).to_numpy(dtype=np.int64)
+
+    floats = np.empty((len(float_columns), len(df)), dtype=np.float64)
+    for i, column in enumerate(float_columns):
+        floats[i] = df[column].to_numpy(dtype=np.float64)
+
+    keys = df[key].to_numpy()
+    ranges = {}
+    for name in pd.unique(keys):
+        positions = np.flatnonzero(keys == name)
+        ranges[name] = [int(positions[0]), int(positions[-1]) + 1]
+
+    _save(int_path, ints)
+    _save(float_path, floats)
+    meta = {
+        "version": CACHE_VERSION,
+        **_source_stamp(source),
+        "key": key,
+        "int_columns": int_columns,
+        "float_columns": float_columns,
+        "strings": strings,
+        "ranges": ranges,
+    }
+    tmp = meta_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_path)
+
+
+def _read_meta(source: str) -> Dict:
+    meta_path = _cache_paths(source)[0]
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if meta.get("version") != CACHE_VERSION:
+        return {}
+    stamp = _source_stamp(source)
+    if meta.get("source_size") != stamp["source_size"] or meta.get("source_mtime_ns") != stamp["source_mtime_ns"]:
+        return {}
+
+    return meta
+
+
+def load(source: str) -> TickTable:
+    """Open the cache for a CSV memory-mapped, (re)building it first if missing or stale."""
+    meta = _read_meta(source)
+    if not meta:
+        build(source)
+        meta = _read_meta(source)
+
+    _, int_path, float_path = _cache_paths(source)
+    ints = np.load(int_path, mmap_mode="r")
+    floats = np.load(float_path, mmap_mode="r")
+
+    columns = {column: ints[i] for i, column in enumerate(meta["int_columns"])}
+    columns.update({column: floats[i] for i, column in enumerate(meta["float_columns"])})
+    ranges = {name: (start, stop) for name, (start, stop) in meta["ranges"].items()}
+    return TickTable(columns, meta["strings"], meta["key"], ranges)
+
+
+def load_books(prices_path: str) -> Dict[int, Dict[Symbol, Tuple[Dict[int, int], Dict[int, int], float]]]:
+    """Same result as backtester.load_prices, built from the cache."""
+    table = load(prices_path)
+    books: Dict[int, Dict[Symbol, Tuple[Dict[int, int], Dict[int, int], float]]] = {}
+
+    # Walk rows in CSV order so snapshots keep the original product order
+    order = np.argsort(table["row"])
+    timestamps = table["timestamp"][order].tolist()
+    products = [table.strings[code] for code in table["product"][order].tolist()]
+    bids = [(table[f"bid_price_{n}"][order].tolist(), table[f"bid_volume_{n}"][order].tolist()) for n in (1, 2, 3)]
+    asks = [(table[f"ask_price_{n}"][order].tolist(), table[f"ask_volume_{n}"][order].tolist()) for n in (1, 2, 3)]
+    mids = table["mid_price"][order].tolist()
+
+    for row, timestamp in enumerate(timestamps):
+        buy_orders = {prices[row]: volumes[row] for prices, volumes in bids if prices[row] != MISSING}
+        sell_orders = {prices[row]: -volumes[row] for prices, volumes in asks if prices[row] != MISSING}
+        snapshot = books.get(timestamp)
+        if snapshot is None:
+            snapshot = books[timestamp] = {}
+        snapshot[products[row]] = (buy_orders, sell_orders, mids[row])
+
+    return books
+
+
+def load_market_trades(trades_path: str) -> Dict[int, Dict[Symbol, List[Trade]]]:
+    """Same result as backtester.load_trades, built from the cache."""
+    trades: Dict[int, Dict[Symbol, List[Trade]]] = {}
+    if not os.path.exists(trades_path):
+        return trades
+
+    table = load(trades_path)
+    strings = table.strings
+    order = np.argsort(table["row"])
+    rows = zip(*(table[column][order].tolist() for column in ("timestamp", "symbol", "price", "quantity", "buyer", "seller")))
+    for timestamp, symbol, price, quantity, buyer, seller in rows:
+        trade = Trade(strings[symbol], price, quantity, strings[buyer], strings[seller], timestamp)
+        trades.setdefault(timestamp, {}).setdefault(trade.symbol, []).append(trade)
+
+    return trades
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build (or refresh) the columnar tick cache for round CSVs.")
+    parser.add_argument("folders", nargs="*", default=["./data/round1/", "./data/round3/"])
+    parser.add_argument("--force", action="store_true", help="rebuild even if the cache is fresh")
+    args = parser.parse_args()
+
+    for folder in args.folders:
+        for source in sorted(glob.glob(os.path.join(folder, "*.csv"))):
+            start = time.perf_counter()
+            if args.force or not _read_meta(source):
+                build(source)
+            table = load(source)
+            print(f"{source}: {len(table)} rows, {len(table.products)} products ({time.perf_counter() - start:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import argparse
+import time
+from typing import Callable, Dict, Iterator, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+import tick_cache
+from datamodel import Symbol, Trade
+
+# One book snapshot: (buy_orders, sell_orders, mid_price), volumes signed like OrderDepth
+Book = Tuple[Dict[int, int], Dict[int, int], float]
+
+# (day, prices_path, trades_path), as listed by backtester.day_files
+DayFiles = Tuple[int, str, str]
+
+# Rows converted from the memory-mapped columns to Python objects at a time
+ROW_CHUNK = 4096
+
+# Opens a CSV's columns: tick_cache.load, or e.g. market_data.table for shared-memory copies
+Loader = Callable[[str], tick_cache.TickTable]
+
+
+class Snapshot(NamedTuple):
+    """Everything at one timestamp: every product's book and the trades printed at that time.
+
+    timestamp is shifted so days follow each other; raw_timestamp is the value in the file.
+    """
+    day: int
+    timestamp: int
+    raw_timestamp: int
+    books: Dict[Symbol, Book]
+    trades: Dict[Symbol, List[Trade]]
+
+
+class TickBatch(NamedTuple):
+    """Up to `ticks` consecutive timestamps of one day as column arrays, in CSV row order.
+
+    Columns are those of the tick cache plus "timestamp" already shifted; string columns hold codes
+    into `strings`.
+    """
+    day: int
+    prices: Dict[str, np.ndarray]
+    trades: Dict[str, np.ndarray]
+    strings: List[str]
+    trade_strings: List[str]
+
+
+def _csv_order(table: tick_cache.TickTable) -> np.ndarray:
+    # The cache groups rows by product; the source CSV (timestamp-major) order is restored from "row"
+    return np.argsort(np.asarray(table["row"]), kind="stable")
+
+
+def _rows(table: tick_cache.TickTable, order: np.ndarray, columns: Sequence[str]) -> Iterator[tuple]:
+    """Yield rows in `order` as tuples, converting only ROW_CHUNK rows to Python objects at once."""
+    for start in range(0, len(order), ROW_CHUNK):
+        chunk = order[start:start + ROW_CHUNK]
+        yield from zip(*(table[column][chunk].tolist() for column in columns))
+
+
+def _trade_groups(trades_path: str, load: Loader) -> Iterator[Tuple[int, Dict[Symbol, List[Trade]]]]:
+    """(timestamp, trades by symbol) in file order, one group per timestamp."""
+    try:
+        table = load(trades_path)
+    except FileNotFoundError:
+        return
+
+    strings = table.strings
+    current = None
+    group: Dict[Symbol, List[Trade]] = {}
+    for timestamp, symbol, price, quantity, buyer, seller in _rows(
+            table, _csv_order(table), ("timestamp", "symbol", "price", "quantity", "buyer", "seller")):
+        if timestamp != current:
+            if current is not None:
+                yield current, group
+            current, group = timestamp, {}
+        trade = Trade(strings[symbol], price, quantity, strings[buyer], strings[seller], timestamp)
+        group.setdefault(trade.symbol, []).append(trade)
+
+    if current is not None:
+        yield current, group
+
+
+def _book_groups(prices_path: str, load: Loader) -> Iterator[Tuple[int, Dict[Symbol, Book]]]:
+    """(timestamp, books by product) in file order, built like tick_cache.load_books but lazily."""
+    table = load(prices_path)
+    strings = table.strings
+    columns = ["timestamp", "product"] + [
+        f"{side}_{field}_{level}" for side in ("bid", "ask") for level in (1, 2, 3) for field in ("price", "volume")
+    ] + ["mid_price"]
+
+    missing = tick_cache.MISSING
+    current = None
+    books: Dict[Symbol, Book] = {}
+    for row in _rows(table, _csv_order(table), columns):
+        timestamp = row[0]
+        if timestamp != current:
+            if current is not None:
+                yield current, books
+            current, books = timestamp, {}
+        bids, asks = row[2:8], row[8:14]
+        buy_orders = {bids[i]: bids[i + 1] for i in (0, 2, 4) if bids[i] != missing}
+        sell_orders = {asks[i]: -asks[i + 1] for i in (0, 2, 4) if asks[i] != missing}
+        books[strings[row[1]]] = (buy_orders, sell_orders, row[14])
+
+    if current is not None:
+        yield current, books
+
+
+def iter_snapshots(days: Sequence[DayFiles], load: Loader = tick_cache.load) -> Iterator[Snapshot]:
+    """Stream per-timestamp snapshots across day files in order, one day's mmap open at a time.
+
+    Timestamps are shifted the way analyze_price_and_trade_data.py does: each day starts one past
+    the previous day's last shifted prices timestamp. The same offset is applied to that day's
+    trades so they line up with its books. Trades printed at a timestamp with no book snapshot are
+    delivered with the next snapshot.
+    """
+    offset = 0
+    for day, prices_path, trades_path in days:
+        trade_groups = _trade_groups(trades_path, load)
+        pending = next(trade_groups, None)
+        last = None
+
+        for timestamp, books in _book_groups(prices_path, load):
+            trades: Dict[Symbol, List[Trade]] = {}
+            while pending is not None and pending[0] <= timestamp:
+                for symbol, symbol_trades in pending[1].items():
+                    trades.setdefault(symbol, []).extend(symbol_trades)
+                pending = next(trade_groups, None)
+
+            yield Snapshot(day, timestamp + offset, timestamp, books, trades)
+            last = timestamp
+
+        if last is not None:
+            offset += last + 1
+
+
+def _timestamp_bounds(timestamps: np.ndarray, ticks: int) -> List[int]:
+    # Row indices where each run of `ticks` distinct timestamps starts (timestamps are non-decreasing)
+    starts = np.flatnonzero(np.r_[True, timestamps[1:] != timestamps[:-1]])
+    return starts[::ticks].tolist() + [len(timestamps)]
+
+
+def iter_batches(days: Sequence[DayFiles], ticks: int = 1000, load: Loader = tick_cache.load) -> Iterator[TickBatch]:
+    """Stream column batches of `ticks` timestamps for vectorized consumers, with the same offsets.
+
+    Only one batch is copied out of the memory-mapped cache at a time.
+    """
+    offset = 0
+    for day, prices_path, trades_path in days:
+        prices = load(prices_path)
+        price_order = _csv_order(prices)
+        price_timestamps = np.asarray(prices["timestamp"])[price_order]
+
+        try:
+            trades = load(trades_path)
+            trade_order = _csv_order(trades)
+            trade_timestamps = np.asarray(trades["timestamp"])[trade_order]
+            trade_strings = trades.strings
+        except FileNotFoundError:
+            trades, trade_order, trade_timestamps, trade_strings = None, np.empty(0, dtype=np.int64), np.empty(0), []
+
+        bounds = _timestamp_bounds(price_timestamps, ticks)
+        for start, stop in zip(bounds, bounds[1:]):
+            rows = price_order[start:stop]
+            batch_prices = {column: np.asarray(values[rows]) for column, values in prices.columns.items() if column != "row"}
+            batch_prices["timestamp"] = batch_prices["timestamp"].astype(np.int64) + offset
+
+            # Trades up to this batch's last timestamp (and, for the first batch, anything earlier)
+            low = 0 if start == 0 else np.searchsorted(trade_timestamps, price_timestamps[start - 1], side="right")
+            high = np.searchsorted(trade_timestamps, price_timestamps[stop - 1], side="right")
+            if stop == len(price_timestamps):
+                high = len(trade_timestamps)
+            trade_rows = trade_order[low:high]
+            batch_trades = {} if trades is None else {
+                column: np.asarray(values[trade_rows]) for column, values in trades.columns.items() if column != "row"
+            }
+            if batch_trades:
+                batch_trades["timestamp"] = batch_trades["timestamp"].astype(np.int64) + offset
+
+            yield TickBatch(day, batch_prices, batch_trades, prices.strings, trade_strings)
+
+        if len(price_timestamps):
+            offset += int(price_timestamps[-1]) + 1
+
+
+def main() -> None:
+    from backtester import day_files
+
+    parser = argparse.ArgumentParser(description="Stream recorded days as snapshots and report throughput.")
+    parser.add_argument("--data", default="./data/round1/")
+    parser.add_argument("--round", type=int, default=1)
+    parser.add_argument("--batch", type=int, default=0, help="stream column batches of this many ticks instead")
+    args = parser.parse_args()
+
+    days = day_files(args.data, args.round)
+    start = time.perf_counter()
+    if args.batch:
+        count = rows = 0
+        for batch in iter_batches(days, args.batch):
+            count += 1
+            rows += len(batch.prices["timestamp"])
+        print(f"{count} batches, {rows} price rows from {len(days)} days in {time.perf_counter() - start:.2f}s")
+    else:
+        count = trades = 0
+        last = None
+        for snapshot in iter_snapshots(days):
+            count += 1
+            trades += sum(len(t) for t in snapshot.trades.values())
+            last = snapshot.timestamp
+        print(f"{count} snapshots, {trades} trades from {len(days)} days in {time.perf_counter() - start:.2f}s "
+              f"(last shifted timestamp {last})")
+
+
+if __name__ == "__main__":
+    main()
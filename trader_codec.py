@@ -0,0 +1,166 @@
+import base64
+import math
+import struct
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Layout (little endian, base64 encoded for the traderData string):
+#   header:  version u8, scale u32, product count u16
+#   index:   per product name length u8, name utf-8, payload length u32
+#   payload: per product, in index order
+# Payload: value count u32, ema f64 (NaN if unset), first value i64, delta width u8, deltas
+# Values are stored as fixed-point ints (round(value * scale)); deltas use the narrowest int width that fits.
+VERSION = 1
+DEFAULT_SCALE = 100
+
+_HEADER = struct.Struct("<BIH")
+_NAME_LENGTH = struct.Struct("<B")
+_PAYLOAD_LENGTH = struct.Struct("<I")
+_SERIES = struct.Struct("<Idqb")
+_WIDTHS = ((1, "b", -(1 << 7), (1 << 7) - 1), (2, "h", -(1 << 15), (1 << 15) - 1),
+           (4, "i", -(1 << 31), (1 << 31) - 1), (8, "q", -(1 << 63), (1 << 63) - 1))
+_NUMPY_THRESHOLD = 64
+_CODES = {width: code for width, code, _, _ in _WIDTHS}
+
+
+def encode_series(values: List[float], ema: Optional[float] = None, scale: int = DEFAULT_SCALE) -> bytes:
+    """Pack one price window into a payload."""
+    ema = math.nan if ema is None else ema
+    if not values:
+        return _SERIES.pack(0, ema, 0, 1)
+
+    # NumPy only pays off once a window is long enough to amortize its per-call overhead
+    if len(values) > _NUMPY_THRESHOLD:
+        fixed = np.rint(np.asarray(values, dtype=np.float64) * scale).astype(np.int64)
+        deltas = np.diff(fixed)
+        low, high = int(deltas.min()), int(deltas.max())
+    else:
+        fixed = [round(value * scale) for value in values]
+        deltas = [b - a for a, b in zip(fixed, fixed[1:])]
+        low, high = min(deltas, default=0), max(deltas, default=0)
+
+    for width, code, type_min, type_max in _WIDTHS:
+        if type_min <= low and high <= type_max:
+            break
+
+    header = _SERIES.pack(len(fixed), ema, int(fixed[0]), width)
+    if isinstance(deltas, np.ndarray):
+        return header + deltas.astype(f"<{code}").tobytes()
+    return header + struct.pack(f"<{len(deltas)}{code}", *deltas)
+
+
+def decode_series(payload: bytes, scale: int = DEFAULT_SCALE) -> Tuple[List[float], Optional[float]]:
+    """Unpack a payload into (values, ema)."""
+    count, ema, first, width = _SERIES.unpack_from(payload)
+    ema = None if math.isnan(ema) else ema
+    if count == 0:
+        return [], ema
+
+    deltas = struct.unpack_from(f"<{count - 1}{_CODES[width]}", payload, _SERIES.size)
+    return [fixed / scale for fixed in accumulate(deltas, initial=first)], ema
+
+
+def pack(payloads: Dict[str, bytes], scale: int = DEFAULT_SCALE) -> str:
+    parts = [_HEADER.pack(VERSION, scale, len(payloads))]
+    for name, payload in payloads.items():
+        encoded = name.encode()
+        parts.append(_NAME_LENGTH.pack(len(encoded)) + encoded + _PAYLOAD_LENGTH.pack(len(payload)))
+    parts.extend(payloads.values())
+
+    return base64.b64encode(b"".join(parts)).decode("ascii")
+
+
+def is_packed(text: str) -> bool:
+    # JSON traderData always starts with "{" or "[", which never begins a base64 string
+    return bool(text) and text[0] not in "{["
+
+
+class PackedState:
+    """Lazily decoded view of a packed traderData string.
+
+    Only the index is parsed up front; raw() hands out a product's payload bytes untouched so
+    they can be re-packed without decoding, and get() decodes a single product on demand.
+    """
+
+    def __init__(self, text: str) -> None:
+        data = base64.b64decode(text)
+        version, self.scale, count = _HEADER.unpack_from(data)
+        if version != VERSION:
+            raise ValueError(f"Unsupported traderData codec version {version}")
+
+        offset = _HEADER.size
+        index = []
+        for _ in range(count):
+            (length,) = _NAME_LENGTH.unpack_from(data, offset)
+            offset += _NAME_LENGTH.size
+            name = data[offset:offset + length].decode()
+            offset += length
+            (payload_length,) = _PAYLOAD_LENGTH.unpack_from(data, offset)
+            offset += _PAYLOAD_LENGTH.size
+            index.append((name, payload_length))
+
+        self.payloads: Dict[str, bytes] = {}
+        for name, payload_length in index:
+            self.payloads[name] = data[offset:offset + payload_length]
+            offset += payload_length
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.payloads
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.payloads)
+
+    def raw(self, name: str) -> bytes:
+        return self.payloads[name]
+
+    def get(self, name: str) -> Tuple[List[float], Optional[float]]:
+        return decode_series(self.payloads[name], self.scale)
+
+
+def _benchmark() -> None:
+    import os
+    import time
+
+    import tick_cache
+    from rolling_stats import RollingStats
+
+    source = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "round3", "trades_round_3_day_0.csv")
+    table = tick_cache.load(source)
+    series = {symbol: table.product(symbol)["price"].tolist() for symbol in table.products}
+    ticks = 500
+
+    print(f"{len(series)} symbols, {ticks} ticks per run")
+    print(f"{'window':>6} {'codec':>6} {'encode us':>10} {'decode us':>10} {'bytes':>7}")
+    for window in (7, 50, 100, 200, 300, 500):
+        stats = RollingStats(window)
+        for symbol, prices in series.items():
+            for price in prices[:window]:
+                stats.update(symbol, price)
+
+        for name, encode in (("json", stats.to_json), ("packed", stats.encode)):
+            encode_time = decode_time = 0.0
+            size = 0
+            for tick in range(ticks):
+                for symbol, prices in series.items():
+                    stats.update(symbol, float(prices[(window + tick) % len(prices)]))
+
+                start = time.perf_counter()
+                text = encode()
+                encode_time += time.perf_counter() - start
+                size = len(text)
+
+                # A fresh instance forces a real decode; every product is read like Trader.run would
+                start = time.perf_counter()
+                restored = RollingStats(window)
+                restored.restore(text)
+                for symbol in series:
+                    restored.get(symbol).mean
+                decode_time += time.perf_counter() - start
+
+            print(f"{window:>6} {name:>6} {encode_time / ticks * 1e6:>10.1f} {decode_time / ticks * 1e6:>10.1f} {size:>7}")
+
+
+if __name__ == "__main__":
+    _benchmark()